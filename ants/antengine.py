@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Struct-of-arrays engine for many Langton's ants and turmites
+https://en.wikipedia.org/wiki/Langton%27s_ant
+
+All ant positions, directions, states and rule indices are kept in NumPy arrays and every ant
+is advanced per step with the lookup tables of its rule (see turmites.py) and tables for the
+movement. The result is the same as calling update and move of the Ant and InvertedAnt classes
+in ants.py for each ant in list order: if several ants are on the same cell, they are updated
+one after the other in list order, each one seeing the colour written by the ants before it.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import numpy as np
+from turmites import parseAntRule
+
+
+# indices of the default rules of an AntColony
+ruleAnt         = 0     # "RL": turn right on 0, left on 1 (Ant class)
+ruleInvertedAnt = 1     # "LR": turn left on 0, right on 1 (InvertedAnt class)
+
+# movement for directions 0=left, 1=up, 2=right, 3=down
+dxTable = np.array([-1, 0, 1, 0], dtype=np.int64)
+dyTable = np.array([0, -1, 0, 1], dtype=np.int64)
+
+
+# AntColony class. Stores the ants as arrays and advances all of them at once on a stage
+class AntColony:
+
+    # constructor.
+    # rules:    list of TurmiteRule objects, an ant's rule is an index into this list.
+    #           defaults to the rules of the Ant and InvertedAnt classes
+    # capacity: initial size of the arrays, they grow when needed
+    def __init__(self, rules=None, capacity=1024):
+
+        if rules is None:
+            rules = [parseAntRule("RL"), parseAntRule("LR")]
+        self.rules = rules
+        self.numColours = max(rule.numColours for rule in rules)
+        self.numStates = max(rule.numStates for rule in rules)
+        if self.numColours > 256:
+            raise ValueError("the stage supports at most 256 colours")
+
+        # tables of all rules stacked into flat arrays indexed by
+        # ((rule*numColours + colour)*numStates + state)*4 + dir.
+        # colours and states a rule doesn't have are mapped to its own modulo its size
+        shape = (len(rules), self.numColours, self.numStates, 4)
+        self.__newColour = np.zeros(shape, dtype=np.uint8)
+        self.__newState = np.zeros(shape, dtype=np.uint8)
+        self.__newDir = np.zeros(shape, dtype=np.uint8)
+        for r, rule in enumerate(rules):
+            colours = np.arange(self.numColours) % rule.numColours
+            states = np.arange(self.numStates) % rule.numStates
+            self.__newColour[r] = rule.newColour[colours][:, states]
+            self.__newState[r] = rule.newState[colours][:, states]
+            self.__newDir[r] = rule.newDir[colours][:, states]
+        self.__newColour = self.__newColour.reshape(-1)
+        self.__newState = self.__newState.reshape(-1)
+        self.__newDir = self.__newDir.reshape(-1)
+
+        self.numAnts = 0
+        self.__x = np.zeros(capacity, dtype=np.int64)
+        self.__y = np.zeros(capacity, dtype=np.int64)
+        self.__dir = np.zeros(capacity, dtype=np.uint8)
+        self.__state = np.zeros(capacity, dtype=np.uint8)
+        self.__rule = np.zeros(capacity, dtype=np.int64)
+
+    # views of the ant arrays. ant i of the colony is (x[i], y[i], dir[i], state[i], rule[i])
+    @property
+    def x(self):
+        return self.__x[0:self.numAnts]
+
+    @property
+    def y(self):
+        return self.__y[0:self.numAnts]
+
+    @property
+    def dir(self):
+        return self.__dir[0:self.numAnts]
+
+    @property
+    def state(self):
+        return self.__state[0:self.numAnts]
+
+    @property
+    def rule(self):
+        return self.__rule[0:self.numAnts]
+
+    # adds an ant at the end of the colony, see the Ant class for the parameters
+    # rule is the index of the ant's rule in the rules list, state its initial turmite state
+    def addAnt(self, xstart, ystart, direction=3, rule=ruleAnt, state=0):
+        if self.numAnts == len(self.__x):
+            self.__grow(2 * len(self.__x))
+
+        i = self.numAnts
+        self.__x[i] = xstart
+        self.__y[i] = ystart
+        self.__dir[i] = direction
+        self.__state[i] = state
+        self.__rule[i] = rule
+        self.numAnts += 1
+
+    # adds n ants with random positions on the stage, directions and the given rule
+    def addRandomAnts(self, n, stage, rule=ruleAnt, seed=None):
+        rng = np.random.default_rng(seed)
+        if self.numAnts + n > len(self.__x):
+            self.__grow(max(2 * len(self.__x), self.numAnts + n))
+
+        i = self.numAnts
+        self.__x[i:i+n] = rng.integers(0, stage.shape[1], n)
+        self.__y[i:i+n] = rng.integers(0, stage.shape[0], n)
+        self.__dir[i:i+n] = rng.integers(0, 4, n)
+        self.__state[i:i+n] = 0
+        self.__rule[i:i+n] = rule
+        self.numAnts += n
+
+    # updates and moves all ants numSteps times on the stage (wrapping at the stage borders).
+    # the stage must be a C-contiguous array
+    def step(self, stage, numSteps=1):
+        if self.numAnts == 0:
+            return
+        if not stage.flags.c_contiguous:
+            raise ValueError("the stage must be a C-contiguous array")
+
+        x = self.x
+        y = self.y
+        flatStage = stage.reshape(-1)
+        width = stage.shape[1]
+        height = stage.shape[0]
+        everyAnt = np.arange(self.numAnts)
+
+        for s in range(numSteps):
+            cell = y * width + x
+
+            # ants on the same cell are updated in rounds, the n-th ant of each cell in round n
+            order = np.argsort(cell, kind='stable')
+            sortedCells = cell[order]
+            groupStart = np.ones(self.numAnts, dtype=bool)
+            groupStart[1:] = sortedCells[1:] != sortedCells[:-1]
+
+            if groupStart.all():
+                self.__updateAnts(everyAnt, cell, flatStage)
+            else:
+                startIndex = np.maximum.accumulate(np.where(groupStart, everyAnt, 0))
+                rank = np.empty(self.numAnts, dtype=np.int64)
+                rank[order] = everyAnt - startIndex
+                for r in range(rank.max() + 1):
+                    self.__updateAnts(np.flatnonzero(rank == r), cell, flatStage)
+
+            direction = self.dir
+            x[:] = (x + dxTable[direction]) % width
+            y[:] = (y + dyTable[direction]) % height
+
+    # updates colour, state and direction for the ants with the given indices, which must
+    # all be on different cells
+    def __updateAnts(self, ants, cell, flatStage):
+        cells = cell[ants]
+        direction = self.__dir[ants]
+        state = self.__state[ants]
+        key = ((self.__rule[ants] * self.numColours + flatStage[cells]) * self.numStates + state) * 4 + direction
+
+        flatStage[cells] = self.__newColour[key]
+        self.__state[ants] = self.__newState[key]
+        self.__dir[ants] = self.__newDir[key]
+
+    # reallocates the ant arrays with the given capacity
+    def __grow(self, capacity):
+        self.__x = self.__resized(self.__x, capacity)
+        self.__y = self.__resized(self.__y, capacity)
+        self.__dir = self.__resized(self.__dir, capacity)
+        self.__state = self.__resized(self.__state, capacity)
+        self.__rule = self.__resized(self.__rule, capacity)
+
+    def __resized(self, array, capacity):
+        newArray = np.zeros(capacity, dtype=array.dtype)
+        newArray[0:self.numAnts] = array[0:self.numAnts]
+        return newArray
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Tight headless kernel for long runs of a single Langton's ant
+https://en.wikipedia.org/wiki/Langton%27s_ant
+
+runAnt does numSteps steps of one ant in a single loop over plain local variables and a flat
+view of the stage, instead of calling Ant.update and Ant.move with their attribute lookups and
+NumPy scalar indexing per step. If numba is installed the loop is compiled to machine code,
+otherwise it runs as plain Python on a memoryview of the stage. Both give exactly the same stage
+and ant state as the Ant and InvertedAnt classes in ants.py.
+
+Run this file to measure the steps per second:
+    python antkernel.py numSteps [numCellsY numCellsX [stepsPerCall]]
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+optional modules:
+    numba    https://pypi.org/project/numba/
+
+"""
+
+import sys
+import time
+import numpy as np
+
+
+# does numSteps steps of an ant on the flat stage of the given width and height.
+# turnOn0 and turnOn1 are the direction changes modulo 4 on cells with value 0 and != 0.
+# returns the new position and direction
+def antKernel( flatStage, width, height, x, y, direction, numSteps, turnOn0, turnOn1 ):
+    cell = y * width + x
+
+    for i in range(numSteps):
+        if flatStage[cell] == 0:
+            direction = (direction + turnOn0) & 3
+            flatStage[cell] = 1
+        else:
+            direction = (direction + turnOn1) & 3
+            flatStage[cell] = 0
+
+        if direction == 0:      # go to left
+            if x == 0:
+                x = width - 1
+                cell += width - 1
+            else:
+                x -= 1
+                cell -= 1
+        elif direction == 1:    # go up
+            if y == 0:
+                y = height - 1
+                cell += (height - 1) * width
+            else:
+                y -= 1
+                cell -= width
+        elif direction == 2:    # go right
+            if x == width - 1:
+                x = 0
+                cell -= width - 1
+            else:
+                x += 1
+                cell += 1
+        else:                   # go down
+            if y == height - 1:
+                y = 0
+                cell -= (height - 1) * width
+            else:
+                y += 1
+                cell += width
+
+    return x, y, direction
+
+
+try:
+    from numba import njit
+    jitKernel = njit(cache=True)(antKernel)
+except ImportError:
+    jitKernel = None
+
+
+# does numSteps steps of an ant starting at (x, y) with the given direction on stage, which
+# must be a C-contiguous uint8 array and is changed in place. inverted selects the InvertedAnt
+# rule. returns the new (x, y, direction) of the ant
+def runAnt( stage, x, y, direction, numSteps, inverted=False ):
+    if not stage.flags.c_contiguous or stage.dtype != np.uint8:
+        raise ValueError("the stage must be a C-contiguous uint8 array")
+
+    turnOn0, turnOn1 = (3, 1) if inverted else (1, 3)
+    flatStage = stage.reshape(-1)
+    height, width = stage.shape
+
+    if jitKernel is not None:
+        x, y, direction = jitKernel(flatStage, width, height, x, y, direction, numSteps, turnOn0, turnOn1)
+        return int(x), int(y), int(direction)
+    return antKernel(memoryview(flatStage), width, height, x, y, direction, numSteps, turnOn0, turnOn1)
+
+
+# advances an Ant or InvertedAnt object of ants.py numSteps steps on stage with runAnt
+def runAntObject( ant, stage, numSteps, inverted=False ):
+    ant.x, ant.y, ant.dir = runAnt(stage, ant.x, ant.y, ant.dir, numSteps, inverted)
+
+
+# runs numSteps steps of one ant from the center of an empty stage in calls of stepsPerCall
+# steps and prints the steps per second
+def benchmark( numSteps, numCellsY=1000, numCellsX=1000, stepsPerCall=10**6 ):
+    stage = np.zeros((numCellsY, numCellsX), dtype=np.uint8)
+    x = numCellsX // 2
+    y = numCellsY // 2
+    direction = 3
+    runAnt(np.zeros((2, 2), dtype=np.uint8), 0, 0, 3, 1)     # compiles the kernel with numba
+
+    start = time.perf_counter()
+    done = 0
+    while done < numSteps:
+        n = min(stepsPerCall, numSteps - done)
+        x, y, direction = runAnt(stage, x, y, direction, n)
+        done += n
+    t = time.perf_counter() - start
+
+    print("kernel: %s   steps: %d   time: %.2f s   steps per second: %.0f"
+          % ("numba" if jitKernel is not None else "python", numSteps, t, numSteps / t))
+    return stage, x, y, direction
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) not in (2, 4, 5):
+        print("Usage: ", sys.argv[0], " numSteps [numCellsY numCellsX [stepsPerCall]]")
+        sys.exit()
+
+    if len(sys.argv) == 2:
+        benchmark(int(sys.argv[1]))
+    else:
+        benchmark(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]),
+                  int(sys.argv[4]) if len(sys.argv) == 5 else 10**6)
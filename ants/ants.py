@@ -39,10 +39,15 @@ required modules:
 """
 
 import sys
+import atexit
 import pygame as pg
 import numpy as np
 import random
 from time import sleep
+from antengine import AntColony, ruleAnt, ruleInvertedAnt
+from turmites import makeRule
+from chunkstage import ChunkStage, ChunkAnt, InvertedChunkAnt
+from checkpoint import AntRecorder
 
 # Ant class 
 # Stores position and handles movement of the ant according to a set of rules
@@ -127,17 +132,50 @@ class InvertedAnt(Ant):
 
 
 
-# draw the stage with color0 for stage value = 0 and color1 for stage value = 1
+# draw the stage with stageColors[v] for stage value = v (color0 for 0 and color1 for 1 with two colours)
 def drawStage( stageArray ):
     
     screen.fill(color0)
     
     for j in range(0, stageArray.shape[0]):
         for i in range(0, stageArray.shape[1]):
-            if stageArray[j][i] == 1:
-                pg.draw.rect(screen, color1, (i*cellSize, j*cellSize, cellSize, cellSize))
+            if stageArray[j][i] != 0:
+                pg.draw.rect(screen, stageColors[stageArray[j][i]], (i*cellSize, j*cellSize, cellSize, cellSize))
     return   
 
+
+# redraws the cells marked in cellMask with their stage colors and returns the rects to update
+def drawCells( stageArray, cellMask ):
+    rects = []
+    rows, cols = np.nonzero(cellMask)
+    for i, j in zip(cols.tolist(), rows.tolist()):
+        rect = pg.Rect(i*cellSize, j*cellSize, cellSize, cellSize)
+        pg.draw.rect(screen, stageColors[stageArray[j][i]], rect)
+        rects.append(rect)
+    return rects
+
+
+# returns the cells of all ants in the window as a list of (i, j), each cell once, and marks
+# them in antMask
+def getAntCells():
+    antMask.fill(False)
+    if useColony:
+        antMask[colony.y, colony.x] = True
+    else:
+        for ant in ants:
+            if 0 <= ant.x < numCellsX and 0 <= ant.y < numCellsY:
+                antMask[ant.y, ant.x] = True
+    rows, cols = np.nonzero(antMask)
+    return list(zip(cols.tolist(), rows.tolist()))
+
+
+# returns numColours colors blending from color0 to color1
+def makeStageColors( numColours ):
+    if numColours == 1:
+        return [color0]
+    return [tuple(int(c0 + (c1 - c0) * v / (numColours - 1)) for c0, c1 in zip(color0, color1))
+            for v in range(numColours)]
+
        
 
 numCellsX = 100
@@ -146,6 +184,16 @@ cellSize  = 5
 color0    = (255, 255, 255)
 color1    = (0, 0, 0)
 colorA    = (255, 0, 0)
+useColony = False      # True: advance all ants at once with the struct-of-arrays engine in antengine.py
+antRule   = None       # multi-colour rule like "RLR" or "LLRR" or a turmite table like "{{{1, 2, 0}, {0, 8, 0}}}"
+                       # for all ants (see turmites.py), uses the colony engine. None for the Ant and InvertedAnt rules
+incrementalDrawing = True  # True: redraw only the cells changed since the last frame and update only their rectangles
+stepsPerFrame      = 1     # simulation steps between two drawn frames
+unboundedStage     = False # True: the ants walk on an unbounded chunked stage (see chunkstage.py) and the window
+                           # shows its cells from (0, 0). ignored with useColony or antRule
+recordPath         = None  # directory to record checkpoints and spawned ants to for replay (see checkpoint.py),
+                           # uses the colony engine. None for no recording
+checkpointInterval = 10000 # with recordPath, number of steps between two checkpoints
 
 winWidth  = numCellsX*cellSize
 winHeight = numCellsY*cellSize
@@ -158,6 +206,10 @@ pg.mouse.set_visible(True)
 
 theStage = np.zeros( (numCellsY, numCellsX), dtype=np.uint8 )
 
+# with incrementalDrawing, the cells changed in this frame and the cells of the ants
+changedMask = np.zeros( (numCellsY, numCellsX), dtype=bool )
+antMask     = np.zeros( (numCellsY, numCellsX), dtype=bool )
+
 # one ant
 ants = [Ant(50, 50)]
 
@@ -167,6 +219,38 @@ ants = [Ant(50, 50)]
 # one Ant and one InvertedAnt
 # ants = [Ant(25, 50), InvertedAnt(75, 50)]
 
+if recordPath is not None:
+    useColony = True
+
+if antRule is not None:
+    useColony = True
+    colony = AntColony([makeRule(antRule)])
+    for ant in ants:
+        colony.addAnt(ant.x, ant.y, ant.dir)
+elif useColony:
+    colony = AntColony()
+    for ant in ants:
+        colony.addAnt(ant.x, ant.y, ant.dir, ruleInvertedAnt if isinstance(ant, InvertedAnt) else ruleAnt)
+
+recorder = None
+if recordPath is not None:
+    recorder = AntRecorder(recordPath, theStage, colony, checkpointInterval)
+    atexit.register(recorder.close)     # also closes the log on exceptions and Ctrl+C
+
+# the stage the ants walk on. theStage is the window that is drawn
+if unboundedStage and not useColony:
+    antStage = ChunkStage()
+    ants = [(InvertedChunkAnt if isinstance(ant, InvertedAnt) else ChunkAnt)(ant.x, ant.y, ant.dir) for ant in ants]
+else:
+    antStage = theStage
+
+stageColors = makeStageColors(colony.numColours if useColony else 2)
+
+# with incrementalDrawing the whole stage is drawn once, later frames only redraw changed cells
+drawStage(theStage)
+pg.display.flip()
+antCells = getAntCells()
+
 
 while 1:
 
@@ -180,14 +264,45 @@ while 1:
         # add new ant on mouse click
         if event.type == pg.MOUSEBUTTONUP: 
             pos = pg.mouse.get_pos()
-            ants.append(Ant((int)(pos[0]/cellSize), (int)(pos[1]/cellSize)))
+            if recorder is not None:
+                recorder.addAnt((int)(pos[0]/cellSize), (int)(pos[1]/cellSize))
+            elif useColony:
+                colony.addAnt((int)(pos[0]/cellSize), (int)(pos[1]/cellSize))
+            else:
+                ants.append((ChunkAnt if unboundedStage else Ant)((int)(pos[0]/cellSize), (int)(pos[1]/cellSize)))
 
-    drawStage(theStage)
-    
-    for ant in ants:
-        ant.update(theStage)
-        ant.move(theStage)
-        ant.draw()
-    
-    pg.display.flip()
+    if not incrementalDrawing:
+        drawStage(theStage)
+
+    # cells the ants step on in this frame and the cells of the ants drawn in the last frame
+    np.copyto(changedMask, antMask)
 
+    for s in range(stepsPerFrame):
+        if useColony:
+            changedMask[colony.y, colony.x] = True
+            if recorder is not None:
+                recorder.step()
+            else:
+                colony.step(theStage)
+        else:
+            for ant in ants:
+                if 0 <= ant.x < numCellsX and 0 <= ant.y < numCellsY:
+                    changedMask[ant.y, ant.x] = True
+                ant.update(antStage)
+                ant.move(antStage)
+
+    if antStage is not theStage:
+        antStage.getStates(theStage)
+
+    antCells = getAntCells()
+
+    if incrementalDrawing:
+        dirtyRects = drawCells(theStage, changedMask)
+    for i, j in antCells:
+        pg.draw.rect(screen, colorA, (i*cellSize, j*cellSize, cellSize, cellSize))
+    
+    if incrementalDrawing:
+        dirtyRects += [pg.Rect(i*cellSize, j*cellSize, cellSize, cellSize) for i, j in antCells]
+        pg.display.update(dirtyRects)
+    else:
+        pg.display.flip()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Checkpoints and a deterministic replay log for ant simulations with AntColony
+
+AntRecorder steps an AntColony on a stage and records the run into a directory. Every
+checkpointInterval steps it writes a checkpoint with the stage (bit-packed for two colours) and
+the ant arrays, zlib compressed in a .npz file. In between it appends every ant spawn with the
+step it happened at to a binary event log, together with the step count at each checkpoint.
+Since the colony is deterministic, replayAnts restores the nearest checkpoint before a step and
+replays the logged spawns and steps from there.
+
+Run this file to print the state of a recorded run at a step:
+    python checkpoint.py logDirectory step
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import sys
+import os
+import struct
+import numpy as np
+from antengine import AntColony, ruleAnt
+from turmites import makeRule
+
+
+# event records: type, direction, state, rule, step, x, y
+eventFormat = "<BBBxIqqq"
+eventSize = struct.calcsize(eventFormat)
+eventSpawn = 1      # an ant was added before the step
+eventSteps = 2      # the run has reached the step
+
+eventFileName = "events.log"
+checkpointFileName = "checkpoint-%012d.npz"
+
+
+# AntRecorder class. Runs an AntColony on a stage and records checkpoints and events
+class AntRecorder:
+
+    # constructor. creates the directory path (if needed) and starts a new log in it.
+    # stage:              uint8 stage array, changed in place
+    # colony:             AntColony, its rules must have been made by makeRule (see turmites.py)
+    # checkpointInterval: number of steps between two checkpoints
+    def __init__(self, path, stage, colony, checkpointInterval=10000):
+
+        self.path = path
+        self.stage = stage
+        self.colony = colony
+        self.checkpointInterval = checkpointInterval
+        self.steps = 0
+
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name == eventFileName or (name.startswith("checkpoint-") and name.endswith(".npz")):
+                os.remove(os.path.join(path, name))
+
+        self.__events = open(os.path.join(path, eventFileName), "wb")
+        self.__writeCheckpoint()
+
+    # adds an ant to the colony and logs it, see AntColony.addAnt for the parameters
+    def addAnt(self, xstart, ystart, direction=3, rule=ruleAnt, state=0):
+        self.colony.addAnt(xstart, ystart, direction, rule, state)
+        self.__events.write(struct.pack(eventFormat, eventSpawn, direction, state, rule, self.steps, xstart, ystart))
+
+    # steps the colony numSteps times, writing checkpoints on the way
+    def step(self, numSteps=1):
+        while numSteps > 0:
+            n = min(numSteps, self.checkpointInterval - self.steps % self.checkpointInterval)
+            self.colony.step(self.stage, n)
+            self.steps += n
+            numSteps -= n
+            if self.steps % self.checkpointInterval == 0:
+                self.__writeCheckpoint()
+
+    # logs the current step count and closes the event log
+    def close(self):
+        if self.__events is None:
+            return
+        self.__events.write(struct.pack(eventFormat, eventSteps, 0, 0, 0, self.steps, 0, 0))
+        self.__events.close()
+        self.__events = None
+
+    def __writeCheckpoint(self):
+        colony = self.colony
+        if colony.numColours == 2:
+            stageData = np.packbits(self.stage != 0)
+        else:
+            stageData = self.stage.reshape(-1)
+
+        np.savez_compressed(os.path.join(self.path, checkpointFileName % self.steps),
+                            steps=self.steps, shape=self.stage.shape, packed=colony.numColours == 2,
+                            stage=stageData, rules=np.array([rule.name for rule in colony.rules]),
+                            x=colony.x, y=colony.y, dir=colony.dir, state=colony.state, rule=colony.rule)
+
+        self.__events.write(struct.pack(eventFormat, eventSteps, 0, 0, 0, self.steps, 0, 0))
+        self.__events.flush()
+
+
+# returns the steps of the checkpoints in the log directory path, sorted
+def getCheckpoints( path ):
+    steps = []
+    for name in os.listdir(path):
+        if name.startswith("checkpoint-") and name.endswith(".npz"):
+            steps.append(int(name[len("checkpoint-"):-len(".npz")]))
+    return sorted(steps)
+
+
+# loads the checkpoint at the given step. returns (stage, colony)
+def loadCheckpoint( path, steps ):
+    with np.load(os.path.join(path, checkpointFileName % steps)) as data:
+        shape = tuple(data["shape"])
+        if data["packed"]:
+            stage = np.unpackbits(data["stage"], count=shape[0]*shape[1]).reshape(shape)
+        else:
+            stage = data["stage"].reshape(shape).copy()
+
+        colony = AntColony([makeRule(str(name)) for name in data["rules"]], max(len(data["x"]), 1))
+        for x, y, direction, state, rule in zip(data["x"], data["y"], data["dir"], data["state"], data["rule"]):
+            colony.addAnt(int(x), int(y), int(direction), int(rule), int(state))
+
+    return stage, colony
+
+
+# returns the events of the log directory path as a list of tuples
+# (type, direction, state, rule, step, x, y)
+def readEvents( path ):
+    with open(os.path.join(path, eventFileName), "rb") as f:
+        data = f.read()
+    return list(struct.iter_unpack(eventFormat, data[0:len(data) - len(data) % eventSize]))
+
+
+# restores the run recorded in the log directory path at the given step from the nearest
+# checkpoint before it. spawns logged at the step itself are not applied yet. returns (stage, colony)
+def replayAnts( path, steps ):
+    events = readEvents(path)
+    lastStep = max((event[4] for event in events), default=0)
+    if steps < 0 or steps > lastStep:
+        raise IndexError("step " + str(steps) + " is not in the log (0 to " + str(lastStep) + ")")
+
+    checkpoint = max(s for s in getCheckpoints(path) if s <= steps)
+    stage, colony = loadCheckpoint(path, checkpoint)
+
+    current = checkpoint
+    for eventType, direction, state, rule, step, x, y in events:
+        if eventType != eventSpawn or step < checkpoint:
+            continue
+        if step >= steps:
+            break
+        colony.step(stage, step - current)
+        current = step
+        colony.addAnt(x, y, direction, rule, state)
+
+    colony.step(stage, steps - current)
+    return stage, colony
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) != 3:
+        print("Usage: ", sys.argv[0], " logDirectory step")
+        print("  replays a recorded ant run to the given step and prints its state")
+        sys.exit()
+
+    stage, colony = replayAnts(sys.argv[1], int(sys.argv[2]))
+    print("step", sys.argv[2], "stage", stage.shape[1], "x", stage.shape[0], "with", np.count_nonzero(stage), "non-zero cells")
+    for i in range(colony.numAnts):
+        print("ant %d: x %d y %d dir %d state %d rule %s" % (i, colony.x[i], colony.y[i], colony.dir[i],
+                                                          colony.state[i], colony.rules[colony.rule[i]].name))
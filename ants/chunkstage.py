@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Unbounded chunked stage for Langton's ants
+https://en.wikipedia.org/wiki/Langton%27s_ant
+
+The stage is stored as square chunks of chunkSize x chunkSize cells in a dict keyed by the chunk
+coordinates (cy, cx). Chunks are allocated when an ant first steps into them, so the memory grows
+with the area the ants visit instead of a fixed wrap-around grid. ChunkAnt and InvertedChunkAnt
+follow the rules of the Ant and InvertedAnt classes in ants.py without wrapping. Each ant caches
+the chunk it is in and its position inside that chunk, so a step is a plain array index unless
+the ant crosses into another chunk.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import numpy as np
+
+
+# ChunkStage class. Stores the cells of an unbounded stage in lazily allocated chunks
+class ChunkStage:
+
+    # constructor. chunkSize: side length of a chunk in cells
+    def __init__(self, chunkSize=64):
+        self.chunkSize = chunkSize
+        self.chunks = {}        # (cy, cx) -> uint8 array of chunkSize x chunkSize cells
+
+    # returns the chunk with chunk coordinates (cy, cx), allocating it if needed
+    def getChunk(self, cy, cx):
+        chunk = self.chunks.get((cy, cx))
+        if chunk is None:
+            chunk = np.zeros((self.chunkSize, self.chunkSize), dtype=np.uint8)
+            self.chunks[(cy, cx)] = chunk
+        return chunk
+
+    # returns the value of the cell at stage coordinates (x, y)
+    def getCell(self, x, y):
+        chunk = self.chunks.get((y // self.chunkSize, x // self.chunkSize))
+        if chunk is None:
+            return 0
+        return chunk[y % self.chunkSize, x % self.chunkSize]
+
+    # sets the value of the cell at stage coordinates (x, y)
+    def setCell(self, x, y, value):
+        if value == 0 and (y // self.chunkSize, x // self.chunkSize) not in self.chunks:
+            return
+        self.getChunk(y // self.chunkSize, x // self.chunkSize)[y % self.chunkSize, x % self.chunkSize] = value
+
+    # writes the stage window with top left corner (x, y) and the size of stageArray into stageArray
+    def getStates(self, stageArray, x=0, y=0):
+        stageArray.fill(0)
+        size = self.chunkSize
+        for cy in range(y // size, (y + stageArray.shape[0] - 1) // size + 1):
+            for cx in range(x // size, (x + stageArray.shape[1] - 1) // size + 1):
+                chunk = self.chunks.get((cy, cx))
+                if chunk is None:
+                    continue
+
+                y0 = max(cy*size, y)
+                y1 = min((cy+1)*size, y + stageArray.shape[0])
+                x0 = max(cx*size, x)
+                x1 = min((cx+1)*size, x + stageArray.shape[1])
+
+                stageArray[y0-y:y1-y, x0-x:x1-x] = chunk[y0-cy*size:y1-cy*size, x0-cx*size:x1-cx*size]
+
+    # returns the bounding box (x0, y0, x1, y1) of the allocated chunks in stage coordinates,
+    # x1 and y1 exclusive. None if no chunk is allocated
+    def getBounds(self):
+        if not self.chunks:
+            return None
+        keys = np.array(list(self.chunks.keys()))
+        cy0, cx0 = keys.min(axis=0)
+        cy1, cx1 = keys.max(axis=0) + 1
+        size = self.chunkSize
+        return int(cx0*size), int(cy0*size), int(cx1*size), int(cy1*size)
+
+    # returns the number of bytes used by the chunks
+    def getMemorySize(self):
+        return len(self.chunks) * self.chunkSize * self.chunkSize
+
+
+# ChunkAnt class. An ant like the Ant class of ants.py that walks on a ChunkStage
+class ChunkAnt:
+
+    # direction changes modulo 4 on cells with value 0 and != 0 (right on 0, left on 1)
+    turnOn0 = 1
+    turnOn1 = 3
+
+    # constructor. Directions are 0=left, 1=up, 2=right, 3=down
+    def __init__(self, xstart, ystart, direction=3):
+        self.x = xstart
+        self.y = ystart
+        self.dir = direction
+
+        # cached chunk of the ant and the ant's position inside it
+        self.__stage = None
+        self.__chunk = None
+        self.__i = 0
+        self.__j = 0
+
+    # updates the ant's direction and the value of the stage under the ant
+    def update(self, stage):
+        if stage is not self.__stage:
+            self.__fetchChunk(stage)
+
+        chunk = self.__chunk
+        if chunk[self.__j, self.__i] == 0:
+            self.dir = (self.dir + self.turnOn0) % 4
+            chunk[self.__j, self.__i] = 1
+        else:
+            self.dir = (self.dir + self.turnOn1) % 4
+            chunk[self.__j, self.__i] = 0
+
+    # moves the ant to its new position after updating the direction
+    def move(self, stage):
+        if stage is not self.__stage:
+            self.__fetchChunk(stage)
+
+        if self.dir == 0:    # go to left
+            self.x -= 1
+            self.__i -= 1
+        elif self.dir == 1:  # go up
+            self.y -= 1
+            self.__j -= 1
+        elif self.dir == 2:  # go right
+            self.x += 1
+            self.__i += 1
+        else:                # go down
+            self.y += 1
+            self.__j += 1
+
+        if not (0 <= self.__i < stage.chunkSize and 0 <= self.__j < stage.chunkSize):
+            self.__fetchChunk(stage)
+
+    # does numSteps steps (update and move) of the ant
+    def run(self, stage, numSteps):
+        for i in range(numSteps):
+            self.update(stage)
+            self.move(stage)
+
+    def __fetchChunk(self, stage):
+        self.__stage = stage
+        self.__chunk = stage.getChunk(self.y // stage.chunkSize, self.x // stage.chunkSize)
+        self.__i = self.x % stage.chunkSize
+        self.__j = self.y % stage.chunkSize
+
+
+# InvertedChunkAnt class. An ant like the InvertedAnt class of ants.py that walks on a ChunkStage
+class InvertedChunkAnt(ChunkAnt):
+
+    turnOn0 = 3
+    turnOn1 = 1
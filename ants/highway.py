@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Highway detection and fast-forward for a single Langton's ant
+https://en.wikipedia.org/wiki/Langton%27s_ant
+
+After about 10000 steps Langton's ant builds a "highway": its moves repeat with a period of
+104 steps while it moves diagonally by 2 cells. HighwayAnt watches the recent moves of the ant
+for such a period with a fixed translation. Once found, it records one more period, checks
+which cells the highway will read ahead of the ant and jumps the ant ahead by whole periods,
+stamping the cells written in a period onto the stage along the way. Where the cells ahead
+aren't what the highway expects (e.g. the highway runs into older tracks), it falls back to
+normal stepping. The result is the same as stepping an Ant (or InvertedAnt) of ants.py.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+from collections import deque
+import numpy as np
+
+
+# movement for directions 0=left, 1=up, 2=right, 3=down
+dxList = [-1, 0, 1, 0]
+dyList = [0, -1, 0, 1]
+
+
+# HighwayAnt class. A single ant on a wrap-around stage that fast-forwards highways
+class HighwayAnt:
+
+    # constructor.
+    # stage:         uint8 stage array, changed in place
+    # xstart, ystart, direction: see the Ant class
+    # inverted:      if True the ant follows the InvertedAnt rule
+    # maxPeriod:     longest period that is detected
+    # checkInterval: number of steps between two checks for a period
+    def __init__(self, stage, xstart, ystart, direction=3, inverted=False, maxPeriod=256, checkInterval=1024):
+        self.stage = stage
+        self.x = xstart
+        self.y = ystart
+        self.dir = direction
+        self.inverted = inverted
+        self.steps = 0
+        self.maxPeriod = maxPeriod
+        self.checkInterval = checkInterval
+
+        # unwrapped position, so translations across the stage border are seen as such
+        self.__ux = xstart
+        self.__uy = ystart
+
+        # directions and unwrapped positions after each of the recent steps
+        self.__history = deque(maxlen=3*maxPeriod)
+
+        self.skippedSteps = 0   # number of steps done by jumps
+
+    # does one step like Ant.update and Ant.move. if log is a dict, the first value read and
+    # the last value written at each cell (relative to origin) are stored in it
+    def step(self, log=None, origin=(0, 0)):
+        stage = self.stage
+        value = stage[self.y, self.x]
+
+        if (value == 0) != self.inverted:
+            self.dir = (self.dir + 1) % 4
+        else:
+            self.dir = (self.dir + 3) % 4
+        stage[self.y, self.x] = 1 - value
+
+        if log is not None:
+            cell = (self.__ux - origin[0], self.__uy - origin[1])
+            if cell not in log:
+                log[cell] = [value, 1 - value]
+            else:
+                log[cell][1] = 1 - value
+
+        self.__ux += dxList[self.dir]
+        self.__uy += dyList[self.dir]
+        self.x = self.__ux % stage.shape[1]
+        self.y = self.__uy % stage.shape[0]
+        self.steps += 1
+        self.__history.append((self.dir, self.__ux, self.__uy))
+
+    # does numSteps steps, jumping over highways
+    def run(self, numSteps):
+        target = self.steps + numSteps
+        nextCheck = self.steps + self.checkInterval
+
+        while self.steps < target:
+            self.step()
+
+            if self.steps >= nextCheck:
+                nextCheck = self.steps + self.checkInterval
+                period = self.findPeriod()
+                if period is not None and target - self.steps >= 2 * period[0]:
+                    self.__jump(period, target)
+
+    # returns (period, tx, ty) if the recent moves repeat with a period and a translation
+    # (tx, ty) != (0, 0), None otherwise. the repetition must have been seen twice.
+    def findPeriod(self):
+        if len(self.__history) < 3:
+            return None
+
+        history = np.array(self.__history, dtype=np.int64)
+        directions = history[:, 0]
+        positions = history[:, 1:]
+
+        for period in range(1, min(self.maxPeriod, len(history) // 3) + 1):
+            recent = directions[-2*period:]
+            if not np.array_equal(recent, directions[-3*period:-period]):
+                continue
+            moves = positions[-2*period:] - positions[-3*period:-period]
+            if np.all(moves == moves[0]) and np.any(moves[0] != 0):
+                return period, int(moves[0][0]), int(moves[0][1])
+
+        return None
+
+    # records one period and jumps over as many periods as possible before target
+    def __jump(self, period, target):
+        period, tx, ty = period
+        stage = self.stage
+        height, width = stage.shape
+
+        # record the cells read and written in one more period
+        origin = (self.__ux, self.__uy)
+        startDir = self.dir
+        log = {}
+        for i in range(period):
+            self.step(log, origin)
+
+        if self.dir != startDir or (self.__ux - origin[0], self.__uy - origin[1]) != (tx, ty):
+            return
+
+        cells = np.array(list(log.keys()), dtype=np.int64)
+        firstRead = np.array([v[0] for v in log.values()], dtype=np.uint8)
+        lastWritten = np.array([v[1] for v in log.values()], dtype=np.uint8)
+
+        # for each cell, the smallest j >= 1 such that the period j periods earlier wrote the
+        # cell, i.e. the cell is at cell + j*T in the recorded period. cells that no earlier
+        # period writes must be read from the stage
+        extent = cells.max(axis=0) - cells.min(axis=0) + 1
+        maxJ = int(max(extent[0] // max(abs(tx), 1), extent[1] // max(abs(ty), 1))) + 1
+        writtenIndex = {tuple(c): i for i, c in enumerate(cells)}
+        earlierWrite = np.zeros(len(cells), dtype=np.int64)    # 0: never written earlier
+        for i, c in enumerate(cells):
+            for j in range(1, maxJ + 1):
+                k = writtenIndex.get((int(c[0]) + j*tx, int(c[1]) + j*ty))
+                if k is not None:
+                    if lastWritten[k] != firstRead[i]:
+                        return      # not a highway that repeats on its own tracks
+                    earlierWrite[i] = j
+                    break
+
+        # number of periods to jump. the swept region must not wrap onto itself
+        numPeriods = (target - self.steps) // period
+        if tx != 0:
+            numPeriods = min(numPeriods, (width - extent[0]) // abs(tx) - 2)
+        if ty != 0:
+            numPeriods = min(numPeriods, (height - extent[1]) // abs(ty) - 2)
+        if numPeriods <= 0:
+            return
+
+        # cells that period k reads from the stage (k < earlierWrite-1) must have the values
+        # the recorded period read. the jump ends before the first period where they don't
+        x1 = self.__ux
+        y1 = self.__uy
+        k = np.arange(numPeriods, dtype=np.int64)
+        fromStage = (earlierWrite[None, :] == 0) | (k[:, None] < earlierWrite[None, :] - 1)
+        checkX = (x1 + cells[None, :, 0] + k[:, None]*tx) % width
+        checkY = (y1 + cells[None, :, 1] + k[:, None]*ty) % height
+        mismatch = fromStage & (stage[checkY, checkX] != firstRead[None, :])
+        badPeriods = np.flatnonzero(mismatch.any(axis=1))
+        if len(badPeriods) > 0:
+            numPeriods = int(badPeriods[0])
+        if numPeriods <= 0:
+            return
+
+        # stamp the written cells of each period, later periods overwrite earlier ones
+        k = np.arange(numPeriods, dtype=np.int64)
+        stampX = ((x1 + cells[None, :, 0] + k[:, None]*tx) % width).reshape(-1)
+        stampY = ((y1 + cells[None, :, 1] + k[:, None]*ty) % height).reshape(-1)
+        flatIndex = stampY * width + stampX
+        values = np.broadcast_to(lastWritten, (numPeriods, len(cells))).reshape(-1)
+        unique, lastIndex = np.unique(flatIndex[::-1], return_index=True)
+        stage.reshape(-1)[unique] = values[::-1][lastIndex]
+
+        self.__ux += numPeriods * tx
+        self.__uy += numPeriods * ty
+        self.x = self.__ux % width
+        self.y = self.__uy % height
+        self.steps += numPeriods * period
+        self.skippedSteps += numPeriods * period
+        self.__history.clear()
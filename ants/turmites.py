@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Multi-colour ant and turmite rules compiled into lookup tables
+https://en.wikipedia.org/wiki/Langton%27s_ant#Extension_to_multiple_colors
+https://en.wikipedia.org/wiki/Turmite
+
+A rule is either a multi-colour ant rulestring like "RL" (Langton's ant), "RLR" or "LLRR", where
+letter c is the turn on colour c and the colour is incremented, or a turmite table in the Golly
+format "{{{newColour, turn, newState}, ...}, ...}" indexed by [state][colour] with the turn codes
+1=no turn, 2=right, 4=u-turn, 8=left. Rules are compiled into dense arrays indexed by
+[colour, state, direction], so every rule costs the same per step.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import ast
+import numpy as np
+
+
+# turns as direction changes modulo 4 for the directions 0=left, 1=up, 2=right, 3=down
+turnLetters = {"N": 0, "R": 1, "U": 2, "L": 3}
+turnCodes = {1: 0, 2: 1, 4: 2, 8: 3}
+
+
+# TurmiteRule class. Stores a rule as lookup tables:
+#   newColour[colour, state, dir]: colour written to the cell under the ant
+#   newState[colour, state, dir]:  new state of the ant
+#   newDir[colour, state, dir]:    new direction of the ant
+class TurmiteRule:
+
+    # constructor.
+    # table: table[state][colour] = (newColour, turn, newState), turn as direction change
+    #        modulo 4 (0=none, 1=right, 2=u-turn, 3=left)
+    # name:  rulestring the rule was made from
+    def __init__(self, table, name=""):
+
+        self.name = name
+        self.numStates = len(table)
+        self.numColours = len(table[0])
+
+        shape = (self.numColours, self.numStates, 4)
+        self.newColour = np.zeros(shape, dtype=np.uint8)
+        self.newState = np.zeros(shape, dtype=np.uint8)
+        self.newDir = np.zeros(shape, dtype=np.uint8)
+
+        for state in range(self.numStates):
+            if len(table[state]) != self.numColours:
+                raise ValueError("all states of a turmite table need the same number of colours")
+            for colour in range(self.numColours):
+                newColour, turn, newState = table[state][colour]
+                if newColour >= self.numColours or newState >= self.numStates:
+                    raise ValueError("turmite table entry " + str(table[state][colour]) + " is out of range")
+                for direction in range(4):
+                    self.newColour[colour, state, direction] = newColour
+                    self.newState[colour, state, direction] = newState
+                    self.newDir[colour, state, direction] = (direction + turn) % 4
+
+
+# compiles a multi-colour ant rulestring like "RL", "RLR" or "LLRR"
+def parseAntRule( ruleString ):
+    ruleString = ruleString.strip().upper()
+    if len(ruleString) < 2 or any(c not in turnLetters for c in ruleString):
+        raise ValueError("invalid ant rulestring '" + ruleString + "', use letters L, R, N and U")
+
+    n = len(ruleString)
+    table = [[((c + 1) % n, turnLetters[ruleString[c]], 0) for c in range(n)]]
+    return TurmiteRule(table, ruleString)
+
+
+# compiles a turmite table in the Golly format, e.g. "{{{1, 2, 0}, {0, 8, 0}}}" for Langton's ant
+def parseTurmiteRule( ruleString ):
+    try:
+        table = ast.literal_eval(ruleString.replace("{", "[").replace("}", "]"))
+        states = [[(int(newColour), turnCodes[int(turnCode)], int(newState))
+                   for newColour, turnCode, newState in colours] for colours in table]
+    except (ValueError, SyntaxError, TypeError, KeyError):
+        raise ValueError("invalid turmite table '" + ruleString + "'")
+
+    return TurmiteRule(states, ruleString)
+
+
+# compiles an ant rulestring or a turmite table
+def makeRule( ruleString ):
+    if ruleString.strip().startswith("{"):
+        return parseTurmiteRule(ruleString)
+    return parseAntRule(ruleString)
@@ -40,6 +40,8 @@ required modules:
 
 import sys
 import getopt
+import time
+from collections import OrderedDict
 
 
 def sumIterative(N, printSteps):
@@ -56,7 +58,56 @@ def sumIterative(N, printSteps):
     return sum
 
 
-def sumRecursive(N, printSteps):
+# MemoCache class. Stores results of recursive calls up to maxSize entries and drops the least
+# recently used entry when full. hits counts the calls answered from the cache
+class MemoCache:
+
+    def __init__(self, maxSize=10000):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.__values = OrderedDict()
+
+    # returns the cached value for key or None
+    def get(self, key):
+        value = self.__values.get(key)
+        if value is not None:
+            self.__values.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.__values[key] = value
+        self.__values.move_to_end(key)
+        if len(self.__values) > self.maxSize:
+            self.__values.popitem(last=False)
+
+    def clear(self):
+        self.__values.clear()
+        self.hits = 0
+
+
+# memo cache shared by the recursive functions, keys are (function name, N)
+memoCache = MemoCache()
+
+# number of calls of the recursive functions (evaluations by the explicit-stack functions)
+callCounts = {"sum": 0, "fibonacci": 0}
+
+
+def resetCallCounts():
+    for name in callCounts:
+        callCounts[name] = 0
+
+
+# recursive sum. if memo is a MemoCache, results are looked up in and stored to it
+def sumRecursive(N, printSteps, memo=None):
+    callCounts["sum"] += 1
+
+    if memo is not None:
+        val = memo.get(("sum", N))
+        if val is not None:
+            if printSteps:
+                print(val, end="")
+            return val
 
     if N == 0:
         if printSteps:
@@ -66,12 +117,48 @@ def sumRecursive(N, printSteps):
         if printSteps:
             print(N, " + ( ", end="")
     
-        val = N + sumRecursive(N-1, printSteps)
+        val = N + sumRecursive(N-1, printSteps, memo)
     
         if printSteps:
             print(" )", end="")
+        if memo is not None:
+            memo.put(("sum", N), val)
         return val
 
+
+# sum like sumRecursive with the same steps printed, but the recursion is kept on an explicit
+# stack instead of the Python call stack, so N is only limited by memory
+def sumStack(N, printSteps, memo=None):
+    pending = []    # values of N waiting for the sum of N-1
+    val = None
+
+    while True:
+        callCounts["sum"] += 1
+        val = memo.get(("sum", N)) if memo is not None else None
+        if val is not None:
+            if printSteps:
+                print(val, end="")
+            break
+        if N == 0:
+            if printSteps:
+                print("0", end="")
+            val = 0
+            break
+        if printSteps:
+            print(N, " + ( ", end="")
+        pending.append(N)
+        N -= 1
+
+    while pending:
+        N = pending.pop()
+        val = N + val
+        if printSteps:
+            print(" )", end="")
+        if memo is not None:
+            memo.put(("sum", N), val)
+
+    return val
+
         
 
 
@@ -96,10 +183,18 @@ def fibonacciIterative(N, printSteps):
     return fn
 
 
-# recursive fibonacci computation
-def fibonacciRecursive(N, printSteps):
+# recursive fibonacci computation. if memo is a MemoCache, results are looked up in and stored to it
+def fibonacciRecursive(N, printSteps, memo=None):
+    callCounts["fibonacci"] += 1
     fn = -1
 
+    if memo is not None:
+        fn = memo.get(("fibonacci", N))
+        if fn is not None:
+            if printSteps:
+                print(fn, end="")
+            return fn
+
     if N == 0:
         if printSteps:
             print("0", end="")
@@ -112,12 +207,12 @@ def fibonacciRecursive(N, printSteps):
         if printSteps:
             print(" ( ", end="")
 
-        fn1 = fibonacciRecursive(N-1, printSteps) 
+        fn1 = fibonacciRecursive(N-1, printSteps, memo) 
 
         if printSteps:
             print("  +  ", end="")
 
-        fn2 = fibonacciRecursive(N-2, printSteps)
+        fn2 = fibonacciRecursive(N-2, printSteps, memo)
         
         if printSteps:
             print(" ) ", end="")
@@ -126,25 +221,275 @@ def fibonacciRecursive(N, printSteps):
 
         if printSteps:
             print("=", fn, end="")
-        else:
-            print(fn, "")
 
+        if memo is not None:
+            memo.put(("fibonacci", N), fn)
+
+    return fn
+
+
+# fibonacci like fibonacciRecursive with the same steps printed, but the recursion is kept on an
+# explicit stack of frames [N, stage, F(N-1)] instead of the Python call stack. stage 0 is a new
+# call, stage 1 has F(N-1) and continues with N-2, stage 2 has F(N-2) and adds both
+def fibonacciStack(N, printSteps, memo=None):
+    stack = [[N, 0, 0]]
+    fn = None       # result of the last finished frame
+
+    while stack:
+        frame = stack[-1]
+        n = frame[0]
+
+        if frame[1] == 0:
+            callCounts["fibonacci"] += 1
+            fn = memo.get(("fibonacci", n)) if memo is not None else None
+            if fn is not None or n <= 1:
+                if fn is None:
+                    fn = n
+                if printSteps:
+                    print(fn, end="")
+                stack.pop()
+                continue
+
+            if printSteps:
+                print(" ( ", end="")
+            frame[1] = 1
+            stack.append([n-1, 0, 0])
+
+        elif frame[1] == 1:
+            frame[2] = fn
+            if printSteps:
+                print("  +  ", end="")
+            frame[1] = 2
+            stack.append([n-2, 0, 0])
+
+        else:
+            fn = frame[2] + fn
+            if printSteps:
+                print(" ) ", end="")
+                print("=", fn, end="")
+            if memo is not None:
+                memo.put(("fibonacci", n), fn)
+            stack.pop()
 
     return fn
 
 
+# runs one of the recursive modes of sum or fibonacci and prints the number of calls
+# mode: 1 recursive, 2 recursive with memo cache, 3 explicit stack, 4 explicit stack with memo cache
+def runRecursiveMode(computeFibonacci, mode, N, printSteps):
+    names = {1: "recursive", 2: "recursive with memo cache", 3: "explicit stack", 4: "explicit stack with memo cache"}
+    if mode not in names:
+        raise ValueError("recursive mode must be 1 to 4, not " + str(mode))
+    print("Using", names[mode], "algorithm")
+
+    resetCallCounts()
+    memoCache.clear()
+    memo = memoCache if mode in (2, 4) else None
+
+    if computeFibonacci:
+        function = fibonacciStack if mode >= 3 else fibonacciRecursive
+        result = function(N, printSteps, memo)
+        callsWithoutMemo = 2 * fibonacciFastDoubling(N+1) - 1
+        calls = callCounts["fibonacci"]
+    else:
+        function = sumStack if mode >= 3 else sumRecursive
+        result = function(N, printSteps, memo)
+        callsWithoutMemo = N + 1
+        calls = callCounts["sum"]
+
+    print("")
+    print("result:", end=" ")
+    printNumber(result)
+    print("calls:", calls, "  cache hits:", memoCache.hits, "  calls without memo cache:", callsWithoutMemo,
+          "  saved:", callsWithoutMemo - calls)
+    return result
+
+
+
+# returns the pair (F(N), F(N+1)) with fast doubling:
+#   F(2k) = F(k) * (2*F(k+1) - F(k)),   F(2k+1) = F(k)^2 + F(k+1)^2
+# going through the bits of N from the highest one. all values are taken modulo m if m is given
+def fibonacciPair(N, m=None):
+    a, b = 0, 1     # F(k), F(k+1) for k = the bits of N seen so far
+
+    for bit in bin(N)[2:]:
+        c = a * (2*b - a)
+        d = a*a + b*b
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+        if m is not None:
+            a %= m
+            b %= m
+
+    return a, b
+
+
+# fibonacci number F(N) by fast doubling, O(log N) multiplications
+def fibonacciFastDoubling(N):
+    return fibonacciPair(N)[0]
+
+
+# generator yielding (i, F(i)) for i = start, start+stride, ... up to stop (excluded, None for no
+# end). only the current pair F(i), F(i+1) is kept; the sequence is started with a fast doubling
+# jump to F(start) and advanced by F(i+s) = F(i)*F(s-1) + F(i+1)*F(s),
+# F(i+s+1) = F(i)*F(s) + F(i+1)*F(s+1) for strides s > 1
+def fibonacciSequence(start=0, stop=None, stride=1):
+    if stride < 1:
+        raise ValueError("stride must be >= 1")
+
+    a, b = fibonacciPair(start)     # F(i), F(i+1)
+    if stride > 1:
+        fs1, fs = fibonacciPair(stride - 1)     # F(s-1), F(s)
+        fs2 = fs1 + fs                          # F(s+1)
+
+    i = start
+    while stop is None or i < stop:
+        yield i, a
+        if stride == 1:
+            a, b = b, a + b
+        else:
+            a, b = a*fs1 + b*fs, a*fs + b*fs2
+        i += stride
+
+
+# fibonacci number F(N) as entry of the matrix power [[1, 1], [1, 0]]^N = [[F(N+1), F(N)], [F(N), F(N-1)]]
+# by repeated squaring
+def fibonacciMatrix(N):
+    result = (1, 0, 0, 1)    # identity, matrices stored as (m00, m01, m10, m11)
+    power = (1, 1, 1, 0)
+
+    while N > 0:
+        if N & 1:
+            result = matrixMultiply(result, power)
+        power = matrixMultiply(power, power)
+        N >>= 1
+
+    return result[1]
+
+
+def matrixMultiply(x, y):
+    return (x[0]*y[0] + x[1]*y[2], x[0]*y[1] + x[1]*y[3],
+            x[2]*y[0] + x[3]*y[2], x[2]*y[1] + x[3]*y[3])
+
+
+# returns the prime factorization of m as dict prime -> exponent by trial division with divisors
+# up to maxDivisor. returns None if m has a factor left that could be composite, i.e. m can't be
+# factored within that budget
+def factorize(m, maxDivisor=1 << 16):
+    factors = {}
+    p = 2
+    while p*p <= m:
+        if p > maxDivisor:
+            return None
+        while m % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            m //= p
+        p += 1 if p == 2 else 2
+    if m > 1:
+        factors[m] = factors.get(m, 0) + 1
+    return factors
+
+
+# returns the divisors of the number with the given prime factorization, sorted
+def divisors(factors):
+    result = [1]
+    for p, e in factors.items():
+        result = [d * p**i for d in result for i in range(e+1)]
+    return sorted(result)
+
+
+pisanoPeriods = {}
+
+# returns the Pisano period of m, the period of the fibonacci numbers modulo m.
+# for a prime p the period divides p-1 (p = +-1 mod 5) or 2(p+1) (p = +-2 mod 5), for a prime
+# power p^e it is p^(e-1) times the period of p, and for other m the lcm of the periods of its
+# prime powers. returns None if the numbers can't be factored by trial division within the
+# budget of factorize (large prime factors), the period is unknown then
+def pisanoPeriod(m):
+    if m in pisanoPeriods:
+        return pisanoPeriods[m]
+
+    factors = factorize(m)
+    if factors is None:
+        pisanoPeriods[m] = None
+        return None
+
+    period = 1
+    for p, e in factors.items():
+        if p == 2:
+            primePeriod = 3
+        elif p == 5:
+            primePeriod = 20
+        else:
+            boundFactors = factorize(p - 1 if p % 5 in (1, 4) else 2*(p + 1))
+            if boundFactors is None:
+                pisanoPeriods[m] = None
+                return None
+            primePeriod = next(d for d in divisors(boundFactors) if fibonacciPair(d, p) == (0, 1))
+
+        primePowerPeriod = primePeriod * p**(e-1)
+        period = period * primePowerPeriod // gcd(period, primePowerPeriod)
+
+    # p^(e-1) * period(p) is only known to hold for all primes tested so far (Wall's conjecture),
+    # don't reduce by a period that doesn't hold
+    if fibonacciPair(period, m) != (0, 1 % m):
+        period = None
+
+    pisanoPeriods[m] = period
+    return period
+
+
+def gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+# fibonacci number F(N) modulo m, N reduced by the Pisano period of m first if it can be found
+# cheaply (see pisanoPeriod), otherwise computed directly by fast doubling modulo m
+def fibonacciMod(N, m):
+    period = pisanoPeriod(m)
+    if period is not None:
+        N %= period
+    return fibonacciPair(N, m)[0]
+
+
+# prints a big number, or only its size and last digits if it is too long to print
+def printNumber(value):
+    if value.bit_length() < 10000:
+        print(value)
+    else:
+        print("number with", value.bit_length(), "bits ending in ...%020d" % (value % 10**20))
+
+
 
 computeFibonacci = 0
 useRecursive = 0
 n = 0
 
-# parse commandline arguments
 
-if len(sys.argv) != 4:
-    print("Usage: ", sys.argv[0], " operation use_recursive N")
-    print("  operation:     'sum' for sum from 1 to N or 'fib' for N-th fibonacci number")
-    print("  use_recursive: 0 for iterative computation, 1 for recursive computation")
+# prints the commandline usage
+def printUsage():
+    print("Usage: ", sys.argv[0], " operation use_recursive N [m | start [stride]]")
+    print("  operation:     'sum' for sum from 1 to N or 'fib' for N-th fibonacci number,")
+    print("                 'fibfast', 'fibmatrix' for only the N-th fibonacci number by fast doubling or matrix power,")
+    print("                 'fibmod' for the N-th fibonacci number modulo m,")
+    print("                 'fibseq' for streaming the fibonacci numbers from start to N with stride")
+    print("  use_recursive: 0 for iterative computation, 1 for recursive computation, 2 for recursive computation")
+    print("                 with memo cache, 3 for recursion on an explicit stack, 4 for explicit stack with memo cache")
+    print("                 (not used by fibfast, fibmatrix, fibmod, fibseq)")
     print("  N:             integer > 0")
+    print("  m:             modulus for fibmod, integer > 0")
+    print("  start, stride: first index and index step for fibseq, defaults 0 and 1")
+
+
+# parse commandline arguments
+
+if not (len(sys.argv) == 4 and sys.argv[1] != "fibmod" or len(sys.argv) == 5 and sys.argv[1] in ("fibmod", "fibseq")
+        or len(sys.argv) == 6 and sys.argv[1] == "fibseq"):
+    printUsage()
     sys.exit()
 
 
@@ -152,15 +497,46 @@ computeFibonacci = (sys.argv[1] == "fib")
 useRecursive = int(sys.argv[2])
 n = int(sys.argv[3])
 
+if sys.argv[1] not in ("fibfast", "fibmatrix", "fibmod", "fibseq") and useRecursive not in range(0, 5):
+    print("use_recursive must be 0 to 4, not", useRecursive)
+    printUsage()
+    sys.exit()
+
 
 # compute
 
-if computeFibonacci:
+if sys.argv[1] == "fibseq":
+    start = int(sys.argv[4]) if len(sys.argv) >= 5 else 0
+    stride = int(sys.argv[5]) if len(sys.argv) == 6 else 1
+    print("Streaming Fibonacci numbers from", start, "to N =", n, "with stride", stride)
+    for i, fn in fibonacciSequence(start, n+1, stride):
+        print(i, end=" ")
+        printNumber(fn)
+
+elif sys.argv[1] in ("fibfast", "fibmatrix", "fibmod"):
+    start = time.perf_counter()
+    if sys.argv[1] == "fibfast":
+        print("Computing Fibonacci number N =", n, "by fast doubling")
+        fn = fibonacciFastDoubling(n)
+    elif sys.argv[1] == "fibmatrix":
+        print("Computing Fibonacci number N =", n, "by matrix power")
+        fn = fibonacciMatrix(n)
+    else:
+        m = int(sys.argv[4])
+        period = pisanoPeriod(m)
+        if period is not None:
+            print("Computing Fibonacci number N =", n, "modulo", m, "with Pisano period", period)
+        else:
+            print("Computing Fibonacci number N =", n, "modulo", m, "by fast doubling (Pisano period not known)")
+        fn = fibonacciMod(n, m)
+    printNumber(fn)
+    print("in", round(time.perf_counter() - start, 3), "seconds")
+
+elif computeFibonacci:
     print("Computing Fibonacci number from 0 to N =", n)
 
     if useRecursive != 0:
-        print("Using recursive algorithm")
-        fibonacciRecursive(n, True)
+        runRecursiveMode(True, useRecursive, n, True)
     else:
         print("Using iterative algorithm")
         fibonacciIterative(n, True)
@@ -169,9 +545,7 @@ else:
     print("Computing sum over numbers 0 to N =", n)
 
     if useRecursive != 0:
-        print("Using recursive algorithm")
-        sum = sumRecursive(n, True)
-        print(" =", sum)
+        runRecursiveMode(False, useRecursive, n, True)
     else:
         print("Using iterative algorithm")
         sum = sumIterative(n, True)
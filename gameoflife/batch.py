@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Headless batch runner for game of life soup searches
+
+Runs many seeded random soups in a process pool until they become periodic or reach a
+generation cap and streams one result per soup (final population, period, generations to
+stabilize) to a JSONL or CSV file as soon as it is finished. Never opens a display.
+
+usage:
+    python batch.py seedStart seedEnd numCellsY numCellsX density maxGenerations outputFile [numWorkers [rule]]
+
+    seeds seedStart to seedEnd-1 are run. outputFile ending with .csv is written as CSV,
+    everything else as JSON lines.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import sys
+import os
+import json
+import csv
+import time
+import multiprocessing as mp
+import numpy as np
+from bitlife import BitLife
+from cycles import CycleDetector
+from patterns import initStatesRandom
+
+
+resultFields = ["seed", "numCellsY", "numCellsX", "density", "rule", "initialPopulation",
+                "finalPopulation", "period", "generations", "stabilized", "seconds"]
+
+
+# runs one soup and returns its result as a dict.
+# the soup is stepped until its board repeats or maxGenerations is reached.
+# generations is the generation where the cycle starts (or maxGenerations), period is None
+# if the soup didn't stabilize.
+def runSoup( seed, numCellsY, numCellsX, density, maxGenerations, rule="B3/S23" ):
+
+    start = time.perf_counter()
+
+    states = np.zeros((numCellsY, numCellsX), dtype=np.uint8)
+    initStatesRandom(states, density, seed)
+
+    world = BitLife(numCellsY, numCellsX, rule)
+    world.setStates(states)
+    initialPopulation = world.getPopulation()
+
+    detector = CycleDetector()
+    detector.update(world.board)
+    while not detector.hasCycle() and world.generation < maxGenerations:
+        world.step()
+        detector.update(world.board)
+
+    return {"seed": seed,
+            "numCellsY": numCellsY,
+            "numCellsX": numCellsX,
+            "density": density,
+            "rule": rule,
+            "initialPopulation": initialPopulation,
+            "finalPopulation": world.getPopulation(),
+            "period": detector.period,
+            "generations": detector.cycleStart if detector.hasCycle() else world.generation,
+            "stabilized": detector.hasCycle(),
+            "seconds": round(time.perf_counter() - start, 4)}
+
+
+def __runSoupArgs( args ):
+    return runSoup(*args)
+
+
+# runs the soups with seeds seedStart to seedEnd-1 in a pool of numWorkers processes and
+# writes the results to outputFile in the order they finish. returns the number of soups.
+def runBatch( seedStart, seedEnd, numCellsY, numCellsX, density, maxGenerations, outputFile,
+              numWorkers=None, rule="B3/S23" ):
+
+    if numWorkers is None:
+        numWorkers = os.cpu_count()
+
+    tasks = ((seed, numCellsY, numCellsX, density, maxGenerations, rule) for seed in range(seedStart, seedEnd))
+    writeCsv = outputFile.lower().endswith(".csv")
+    count = 0
+
+    with open(outputFile, "w", newline="") as f:
+        if writeCsv:
+            writer = csv.DictWriter(f, fieldnames=resultFields)
+            writer.writeheader()
+
+        with mp.Pool(numWorkers) as pool:
+            for result in pool.imap_unordered(__runSoupArgs, tasks):
+                if writeCsv:
+                    writer.writerow(result)
+                else:
+                    f.write(json.dumps(result) + "\n")
+                f.flush()
+                count += 1
+
+    return count
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 8 or len(sys.argv) > 10:
+        print("Usage: ", sys.argv[0], " seedStart seedEnd numCellsY numCellsX density maxGenerations outputFile [numWorkers [rule]]")
+        print("  seedStart, seedEnd: soups with seeds seedStart to seedEnd-1 are run")
+        print("  density:            probability of a cell to be alive initially, e.g. 0.2")
+        print("  maxGenerations:     generation cap for soups that don't stabilize")
+        print("  outputFile:         results file, CSV if it ends with .csv, JSON lines otherwise")
+        print("  numWorkers:         number of processes, defaults to the number of cpus")
+        print("  rule:               B/S rulestring, defaults to B3/S23")
+        sys.exit()
+
+    numWorkers = int(sys.argv[8]) if len(sys.argv) > 8 else None
+    rule = sys.argv[9] if len(sys.argv) > 9 else "B3/S23"
+
+    start = time.perf_counter()
+    count = runBatch(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]),
+                     float(sys.argv[5]), int(sys.argv[6]), sys.argv[7], numWorkers, rule)
+    print(count, "soups in", round(time.perf_counter() - start, 2), "seconds")
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Bit-packed game of life board
+
+Every row of the board is stored as uint64 words with 64 cells per word (cell x is bit x%64
+of word x//64). The next generation is computed for 64 cells at once with bitwise adder
+logic, including the carry of neighbor cells across word boundaries. Rows are processed in
+bands, so besides the two packed boards only a few band-sized scratch arrays are needed and
+memory use is about 1/8 of a board of uint8 cells.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import numpy as np
+from life import parseRule
+
+
+one = np.uint64(1)
+shift63 = np.uint64(63)
+
+# number of set bits of every byte value, counts the cells where np.bitwise_count (NumPy 2.0) is missing
+byteBitCounts = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+# packs a uint8 states array into an array of uint64 words, 64 cells per word
+def packStates( statesArray ):
+    numY, numX = statesArray.shape
+    numWords = (numX + 63) // 64
+
+    padded = np.zeros((numY, numWords*64), dtype=np.uint8)
+    padded[:, 0:numX] = statesArray != 0
+
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8').astype(np.uint64)
+
+
+# unpacks an array of uint64 words into statesArray, which determines the number of cells per row
+def unpackStates( packedArray, statesArray ):
+    numX = statesArray.shape[1]
+    packedBytes = packedArray.astype('<u8').view(np.uint8)
+    statesArray[:, :] = np.unpackbits(packedBytes, axis=1, count=numX, bitorder='little')
+
+
+# BitLife class. Stores a bit-packed board and computes generations of a Life-like rule on it.
+class BitLife:
+
+    # constructor.
+    # numCellsY, numCellsX: board size in cells
+    # rule:                 B/S rulestring (see life.py)
+    # wrap:                 if False cells outside the board are dead, if True the board is a torus
+    # bandRows:             number of rows computed at once, determines the size of the scratch arrays
+    def __init__(self, numCellsY, numCellsX, rule="B3/S23", wrap=False, bandRows=256):
+
+        self.numCellsY = numCellsY
+        self.numCellsX = numCellsX
+        self.numWords = (numCellsX + 63) // 64
+        self.wrap = wrap
+        self.bandRows = min(bandRows, numCellsY)
+        self.generation = 0
+
+        self.birth, self.survival = parseRule(rule)
+
+        # mask of the valid bits in the last word of a row
+        lastBits = numCellsX - (self.numWords-1)*64
+        self.lastMask = np.uint64((1 << lastBits) - 1)
+        self.lastBit = np.uint64(lastBits - 1)
+
+        self.board = np.zeros((numCellsY, self.numWords), dtype=np.uint64)
+        self.__next = np.zeros((numCellsY, self.numWords), dtype=np.uint64)
+
+        # band scratch arrays: rows above and below, a shifted row plane, a temporary,
+        # the four bits of the neighbor count and the rule's result
+        scratchShape = (self.bandRows, self.numWords)
+        self.__above = np.zeros(scratchShape, dtype=np.uint64)
+        self.__below = np.zeros(scratchShape, dtype=np.uint64)
+        self.__plane = np.zeros(scratchShape, dtype=np.uint64)
+        self.__tmp = np.zeros(scratchShape, dtype=np.uint64)
+        self.__count = [np.zeros(scratchShape, dtype=np.uint64) for i in range(4)]
+        self.__result = np.zeros(scratchShape, dtype=np.uint64)
+
+    # copies a uint8 states array of the board's size into the packed board
+    def setStates(self, statesArray):
+        self.board[:, :] = packStates(statesArray)
+
+    # writes the packed board into a uint8 states array of the board's size
+    def getStates(self, statesArray):
+        unpackStates(self.board, statesArray)
+
+    def getPopulation(self):
+        if hasattr(np, "bitwise_count"):
+            return int(np.bitwise_count(self.board).sum())
+        return int(byteBitCounts[np.ascontiguousarray(self.board).view(np.uint8)].sum())
+
+    # returns the number of bytes used by the boards and scratch arrays
+    def getMemorySize(self):
+        scratch = [self.__above, self.__below, self.__plane, self.__tmp, self.__result] + self.__count
+        return 2*self.board.nbytes + sum(a.nbytes for a in scratch)
+
+    # advances the board by one generation
+    def step(self):
+        for y0 in range(0, self.numCellsY, self.bandRows):
+            self.__stepBand(y0, min(y0 + self.bandRows, self.numCellsY))
+
+        tmp = self.board
+        self.board = self.__next
+        self.__next = tmp
+        self.generation += 1
+
+    # advances the board by n generations
+    def advance(self, n):
+        for i in range(n):
+            self.step()
+
+    # computes the next generation of rows y0 to y1-1 into the next board
+    def __stepBand(self, y0, y1):
+
+        rows = y1 - y0
+        board = self.board
+        mid = board[y0:y1]
+        above = self.__above[0:rows]
+        below = self.__below[0:rows]
+
+        # row y of above holds row y-1 of the board, row y of below holds row y+1
+        above[1:] = board[y0:y1-1]
+        if y0 > 0:
+            above[0] = board[y0-1]
+        elif self.wrap:
+            above[0] = board[self.numCellsY-1]
+        else:
+            above[0] = 0
+
+        below[:-1] = board[y0+1:y1]
+        if y1 < self.numCellsY:
+            below[-1] = board[y1]
+        elif self.wrap:
+            below[-1] = board[0]
+        else:
+            below[-1] = 0
+
+        count = [c[0:rows] for c in self.__count]
+        for c in count:
+            c.fill(0)
+
+        # add the eight neighbor planes to the bit-sliced counter
+        plane = self.__plane[0:rows]
+        for src in (above, mid, below):
+            if src is not mid:
+                self.__addPlane(count, src)
+            self.__shiftWest(src, plane)
+            self.__addPlane(count, plane)
+            self.__shiftEast(src, plane)
+            self.__addPlane(count, plane)
+
+        # apply the rule: next = (dead and count in birth) or (alive and count in survival)
+        result = self.__result[0:rows]
+        nextBand = self.__next[y0:y1]
+        self.__countIn(count, self.birth, result)
+        np.bitwise_and(result, ~mid, out=nextBand)
+        self.__countIn(count, self.survival, result)
+        np.bitwise_and(result, mid, out=result)
+        np.bitwise_or(nextBand, result, out=nextBand)
+
+        # clear the padding bits behind the last cell of each row
+        nextBand[:, -1] &= self.lastMask
+
+    # shifts each row one cell to the east, so that each cell holds its western neighbor
+    def __shiftWest(self, src, out):
+        np.left_shift(src, one, out=out)
+        tmp = self.__tmp[0:src.shape[0]]
+        np.right_shift(src[:, :-1], shift63, out=tmp[:, :-1])
+        np.bitwise_or(out[:, 1:], tmp[:, :-1], out=out[:, 1:])
+        out[:, -1] &= self.lastMask
+        if self.wrap:
+            out[:, 0] |= (src[:, -1] >> self.lastBit) & one
+
+    # shifts each row one cell to the west, so that each cell holds its eastern neighbor
+    def __shiftEast(self, src, out):
+        np.right_shift(src, one, out=out)
+        tmp = self.__tmp[0:src.shape[0]]
+        np.left_shift(src[:, 1:], shift63, out=tmp[:, :-1])
+        np.bitwise_or(out[:, :-1], tmp[:, :-1], out=out[:, :-1])
+        if self.wrap:
+            out[:, -1] |= (src[:, 0] & one) << self.lastBit
+
+    # adds a plane of single bits to the 4 bit counter count (ripple carry of half adders)
+    def __addPlane(self, count, plane):
+        carry = self.__tmp[0:plane.shape[0]]
+        np.bitwise_and(count[0], plane, out=carry)
+        np.bitwise_xor(count[0], plane, out=count[0])
+        for c in count[1:]:
+            np.bitwise_xor(c, carry, out=c)
+            # the new carry is the old bit and the carry, i.e. the carry without the new bit
+            np.bitwise_and(carry, ~c, out=carry)
+
+    # sets the bits of result where the neighbor count is one of the numbers in counts
+    def __countIn(self, count, counts, result):
+        result.fill(0)
+        for n in counts:
+            match = ~np.uint64(0)
+            for k in range(4):
+                if (n >> k) & 1:
+                    match = match & count[k]
+                else:
+                    match = match & ~count[k]
+            result |= match
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Cycle and still life detection for game of life runs
+
+Keeps a bounded history of hashes of the bit-packed board. When a board repeats, the run has
+entered a cycle (period 1 for still lifes and dead boards), and any later generation equals a
+generation within the cycle, so a run can be stopped or fast-forwarded with modular arithmetic.
+Unbounded worlds are fed with a key of the whole world (e.g. TiledLife.getStateKey) instead of
+a window of it, so a pattern that leaves the window isn't mistaken for a still life.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import hashlib
+from collections import deque
+import numpy as np
+
+
+# returns a 128 bit hash of a board. uint8 states arrays are bit-packed first, other
+# arrays (e.g. the uint64 words of a BitLife board) are hashed as they are
+def hashStates( statesArray ):
+    if statesArray.dtype == np.uint8:
+        data = np.packbits(statesArray).tobytes() + bytes(str(statesArray.shape), "ascii")
+    else:
+        data = np.ascontiguousarray(statesArray).tobytes()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# CycleDetector class. Feed it the board of every generation with update().
+class CycleDetector:
+
+    # constructor.
+    # maxHistory: number of board hashes to keep. cycles with a longer period aren't detected.
+    #             if older hashes were dropped, cycleStart may be later than the real start.
+    def __init__(self, maxHistory=4096):
+        self.maxHistory = maxHistory
+        self.reset()
+
+    # forgets all boards, e.g. after the board was edited. the next board is generation 0
+    def reset(self, generation=0):
+        self.__seen = {}            # hash -> generation
+        self.__order = deque()      # hashes in the order they were seen
+        self.generation = generation - 1
+        self.period = None
+        self.cycleStart = None
+
+    def hasCycle(self):
+        return self.period is not None
+
+    # adds the board of the next generation. returns True if the board completed a cycle
+    # (only for the first repetition, later calls return False)
+    # generation: generation of the board, None for the one after the previous board. pass it
+    #             if boards are several generations apart (e.g. hashlife steps), so period and
+    #             cycleStart are counted in generations. the period is then a multiple of the
+    #             distance between two boards.
+    def update(self, statesArray, generation=None):
+        return self.updateKey(hashStates(statesArray), generation)
+
+    # like update, but with a hashable key of the board instead of the board. equal keys must
+    # mean equal boards
+    def updateKey(self, h, generation=None):
+        if generation is None:
+            self.generation += 1
+        else:
+            self.generation = generation
+        if self.period is not None:
+            return False
+
+        previous = self.__seen.get(h)
+        if previous is not None:
+            self.cycleStart = previous
+            self.period = self.generation - previous
+            return True
+
+        self.__seen[h] = self.generation
+        self.__order.append(h)
+        if len(self.__order) > self.maxHistory:
+            del self.__seen[self.__order.popleft()]
+
+        return False
+
+    # returns the generation in [cycleStart, cycleStart+period) whose board equals the board
+    # of the given generation (>= cycleStart). without a cycle, this is the generation itself
+    def getEquivalentGeneration(self, generation):
+        if self.period is None or generation < self.cycleStart:
+            return generation
+        return self.cycleStart + (generation - self.cycleStart) % self.period
+
+    # returns the number of generations the current board has to be advanced to equal the
+    # board of targetGeneration. this is less than the period, no matter how large the target is
+    def getStepsTo(self, targetGeneration):
+        if self.period is None:
+            return targetGeneration - self.generation
+        if targetGeneration < self.generation:
+            raise ValueError("target generation " + str(targetGeneration) + " is before the current generation")
+        return (targetGeneration - self.generation) % self.period
@@ -39,17 +39,22 @@ required modules:
 """
 
 import sys
+import atexit
 import pygame as pg
 import numpy as np
-import random
 from time import sleep
+from life import makeRuleTable, countNeighborsFast, updateStatesVectorized
+from hashlife import HashLife
+from tiledlife import TiledLife
+from bitlife import BitLife
+from cycles import CycleDetector
+from patterns import initStatesRandom, loadPattern
+from recorder import HistoryRecorder
 
 
 def initStates( statesArray ):
   
-    for j in range(0, statesArray.shape[0]):
-        for i in range(0, statesArray.shape[1]):
-            statesArray[j][i] = random.choice([0, 0, 0, 0, 1])
+    initStatesRandom(statesArray, density, seed)
     
     return
 
@@ -74,6 +79,48 @@ def drawStates( statesArray ):
     return   
 
 
+# draws the states by blitting the cell surface scaled to the window size and returns the
+# screen rectangles of the tiles that changed since the last call, for pg.display.update.
+# displayedArray holds the states currently shown on screen and is updated.
+def drawStatesFast( statesArray, displayedArray ):
+
+    # changed cells, reduced to tiles of tileSize x tileSize cells
+    np.not_equal(statesArray, displayedArray, out=changedCells)
+    changedTiles = np.logical_or.reduceat(np.logical_or.reduceat(changedCells, tileRows, axis=0), tileCols, axis=1)
+
+    if not changedTiles.any():
+        return []
+
+    pg.surfarray.blit_array(cellSurface, statesArray.T)
+    pg.transform.scale(cellSurface, (winWidth, winHeight), scaledSurface)
+    np.copyto(displayedArray, statesArray)
+
+    # one rectangle per run of changed tiles in a tile row
+    rects = []
+    for tj, ti in zip(*np.nonzero(changedTiles)):
+        x = ti*tileSize*cellSize
+        y = tj*tileSize*cellSize
+        if rects and rects[-1].top == y and rects[-1].right == x:
+            rects[-1].width += tileSize*cellSize
+        else:
+            rects.append(pg.Rect(x, y, tileSize*cellSize, tileSize*cellSize))
+
+    rects = [rect.clip(screen.get_rect()) for rect in rects]
+    for rect in rects:
+        screen.blit(scaledSurface, rect, rect)
+
+    return rects
+
+
+# feeds the board to the cycle detector and returns True if it completed a cycle. the
+# unbounded engines are keyed by their whole world, so patterns leaving the window don't
+# look like still lifes, and by their generation, as hashlife frames can be many generations apart
+def updateCycleDetector( statesArray ):
+    if engine == "hashlife" or engine == "tiled":
+        return cycleDetector.updateKey(world.getStateKey(), world.generation)
+    return cycleDetector.update(statesArray)
+
+
 def updateStates( statesArray, statesBufferArray ):
     for j in range(0, statesArray.shape[0]):
         for i in range(0, statesArray.shape[1]):
@@ -138,29 +185,22 @@ def countNeighbors( statesArray, x, y ):
     return cnt
 
 
-def countNeighborsFast( statesArray, neighborsArray ):
-    neighborsArray.fill(0)
-    
-    neighborsArray[0:numCellsY-1, 0:numCellsX-1] += statesArray[1:numCellsY, 1:numCellsX]
-    neighborsArray[0:numCellsY-1, 0:numCellsX] += statesArray[1:numCellsY, 0:numCellsX]
-    neighborsArray[0:numCellsY-1, 1:numCellsX] += statesArray[1:numCellsY, 0:numCellsX-1]
-    
-    neighborsArray[0:numCellsY, 0:numCellsX-1] += statesArray[0:numCellsY, 1:numCellsX]
-    neighborsArray[0:numCellsY, 1:numCellsX] += statesArray[0:numCellsY, 0:numCellsX-1]
-    
-    neighborsArray[1:numCellsY, 0:numCellsX-1] += statesArray[0:numCellsY-1, 1:numCellsX]
-    neighborsArray[1:numCellsY, 0:numCellsX] += statesArray[0:numCellsY-1, 0:numCellsX]
-    neighborsArray[1:numCellsY, 1:numCellsX] += statesArray[0:numCellsY-1, 0:numCellsX-1]
-
-    return
-       
-
-
 numCellsX = 100
 numCellsY = 100
 cellSize  = 5
 color0    = (255, 255, 255)
 color1    = (0, 0, 0)
+rule      = "B3/S23"   # B/S rulestring, e.g. "B36/S23" for HighLife or "B2/S" for Seeds
+wrapEdges = False      # True: board is a torus, False: cells outside the board are dead
+engine    = "dense"    # "dense" or "bitpacked": fixed board, "hashlife" or "tiled": unbounded world (wrapEdges is ignored)
+hashlifeStepExp = 0    # with hashlife, every frame advances the world by 2^hashlifeStepExp generations
+fastDrawing = True     # True: draw with surface blits and update only changed rectangles
+tileSize    = 16       # with fastDrawing, size of the screen tiles (in cells) checked for changes
+stopOnCycle = True     # True: stop updating once the board repeats (still life or oscillator)
+density     = 0.2      # probability of a cell to be alive in the random initial board
+seed        = None     # seed of the random initial board, None for a different board every run
+patternFile = None     # path of a .rle or .cells pattern to load (centered) instead of a random board
+recordFile  = None     # path of a history file to record every generation to (see recorder.py)
 
 winWidth  = numCellsX*cellSize
 winHeight = numCellsY*cellSize
@@ -174,8 +214,41 @@ pg.mouse.set_visible(True)
 states       = np.zeros( (numCellsY, numCellsX), dtype=np.uint8 )
 statesBuffer = np.zeros( (numCellsY, numCellsX), dtype=np.uint8 )
 neighbors    = np.zeros((numCellsY, numCellsX), dtype=np.uint8 )
+ruleTable    = makeRuleTable(rule)
+
+# buffers for drawStatesFast
+displayedStates = np.full( (numCellsY, numCellsX), 255, dtype=np.uint8 )  # nothing displayed yet
+changedCells    = np.zeros( (numCellsY, numCellsX), dtype=bool )
+tileRows        = np.arange(0, numCellsY, tileSize)
+tileCols        = np.arange(0, numCellsX, tileSize)
+cellSurface     = pg.Surface( (numCellsX, numCellsY), depth=8 )
+cellSurface.set_palette([color0, color1])
+scaledSurface   = pg.Surface( (winWidth, winHeight), depth=8 )
+scaledSurface.set_palette([color0, color1])
+
+if patternFile is not None:
+    loadPattern(patternFile, states)
+else:
+    initStates(states)
 
-initStates(states)
+if engine == "hashlife":
+    world = HashLife(rule)
+    world.setStates(states)
+elif engine == "tiled":
+    world = TiledLife(rule)
+    world.setStates(states)
+elif engine == "bitpacked":
+    world = BitLife(numCellsY, numCellsX, rule, wrapEdges)
+    world.setStates(states)
+
+cycleDetector = CycleDetector()
+updateCycleDetector(states)
+
+recorder = None
+if recordFile is not None:
+    recorder = HistoryRecorder(recordFile, numCellsY, numCellsX)
+    atexit.register(recorder.close)     # also closes the files on exceptions and Ctrl+C
+    recorder.append(states)
 
 mousePressed = False
 
@@ -192,22 +265,47 @@ while 1:
         pos = pg.mouse.get_pos()
         if states[(int)(pos[1]/cellSize), (int)(pos[0]/cellSize)] == 0:
             states[(int)(pos[1]/cellSize), (int)(pos[0]/cellSize)] = 1
+            if engine == "bitpacked":
+                world.setStates(states)
+            elif engine != "dense":
+                world.setCell((int)(pos[0]/cellSize), (int)(pos[1]/cellSize), 1)
+            cycleDetector.reset(cycleDetector.generation)
+            updateCycleDetector(states)
         
        # sleep(0.1)
 
-        drawStates(states)
+    if fastDrawing:
+        dirtyRects = drawStatesFast(states, displayedStates)
     else:
-
         drawStates(states)
-        
+
+    if not mousePressed and not (stopOnCycle and cycleDetector.hasCycle()):
+
         #sleep(0.1)
         
-        # updateStates(states, statesBuffer)
-        updateStatesFast(states, statesBuffer, neighbors)
-        
-        tmp = states
-        states = statesBuffer
-        statesBuffer = tmp
+        if engine == "hashlife":
+            world.stepPow2(hashlifeStepExp)
+            world.getStates(states)
+        elif engine == "tiled" or engine == "bitpacked":
+            world.step()
+            world.getStates(states)
+        else:
+            # updateStates(states, statesBuffer)
+            # updateStatesFast(states, statesBuffer, neighbors)
+            updateStatesVectorized(states, statesBuffer, neighbors, ruleTable, wrapEdges)
+
+            tmp = states
+            states = statesBuffer
+            statesBuffer = tmp
+
+        if updateCycleDetector(states):
+            print("cycle with period", cycleDetector.period, "starting at generation", cycleDetector.cycleStart)
+
+        if recorder is not None:
+            recorder.append(states)
         
-    pg.display.flip()
+    if fastDrawing:
+        pg.display.update(dirtyRects)
+    else:
+        pg.display.flip()
 
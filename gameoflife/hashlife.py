@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Hashlife engine for Life-like cellular automata
+https://en.wikipedia.org/wiki/Hashlife
+
+The world is an unbounded quadtree of canonical (hash-consed) nodes. The result of advancing
+a node is memoized, so repetitive patterns can be advanced by 2^k generations in time that is
+roughly proportional to k. Boards are converted from and to the uint8 states arrays used by
+gameoflife.py, so the pygame view can display the result.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import numpy as np
+from life import parseRule
+
+
+# HashLifeNode class. A node of level k is a square of 2^k x 2^k cells made of four
+# nodes of level k-1 (nw, ne, sw, se). Level 0 nodes are single cells.
+# Nodes are canonical: never create them directly, use HashLife.join
+class HashLifeNode:
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+# HashLife class. Stores the world as a root node with the world coordinates of its
+# top left cell and advances it with the hashlife algorithm.
+class HashLife:
+
+    # constructor.
+    # rule:         B/S rulestring (see life.py). rules with birth on 0 neighbors are not supported
+    # maxCacheSize: maximum number of canonical nodes plus memoized results. if exceeded, the
+    #               caches are garbage collected between two steps, keeping only the current world
+    def __init__(self, rule="B3/S23", maxCacheSize=1 << 22):
+
+        birth, survival = parseRule(rule)
+        if 0 in birth:
+            raise ValueError("hashlife doesn't support rules with birth on 0 neighbors")
+
+        self.birth = birth
+        self.survival = survival
+        self.maxCacheSize = maxCacheSize
+
+        self.__dead = HashLifeNode(0, None, None, None, None, 0)
+        self.__alive = HashLifeNode(0, None, None, None, None, 1)
+
+        self.__nodes = {}       # (nw, ne, sw, se) -> canonical node
+        self.__results = {}     # (node, j) -> node advanced by 2^j generations
+        self.__zeros = [self.__dead]
+
+        self.root = self.zero(3)
+        self.x = 0              # world coordinates of the root's top left cell
+        self.y = 0
+        self.generation = 0
+
+    # returns the canonical node for the four given children
+    def join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self.__nodes.get(key)
+        if node is None:
+            node = HashLifeNode(nw.level + 1, nw, ne, sw, se,
+                                nw.population + ne.population + sw.population + se.population)
+            self.__nodes[key] = node
+        return node
+
+    # returns the empty node of the given level
+    def zero(self, level):
+        while len(self.__zeros) <= level:
+            z = self.__zeros[-1]
+            self.__zeros.append(self.join(z, z, z, z))
+        return self.__zeros[level]
+
+    # returns the number of cached nodes and results
+    def getCacheSize(self):
+        return len(self.__nodes) + len(self.__results)
+
+    def getPopulation(self):
+        return self.root.population
+
+    # returns a hashable key of the whole world. the root is shrunk to its smallest centered
+    # node first, so the padding doesn't change the key. equal keys mean equal worlds, but
+    # after collectGarbage an equal world may get a different key
+    def getStateKey(self):
+        node = self.root
+        x = self.x
+        y = self.y
+        while node.level > 3 and self.__isPadded(node):
+            quarter = 1 << (node.level - 2)
+            node = self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+            x += quarter
+            y += quarter
+        return (x, y, node)
+
+    # replaces the world by the cells of statesArray. the top left cell of the array is put at
+    # world coordinates (x, y) and the generation counter is reset.
+    def setStates(self, statesArray, x=0, y=0):
+
+        size = max(statesArray.shape[0], statesArray.shape[1], 8)
+        level = (size - 1).bit_length()
+
+        padded = np.zeros((1 << level, 1 << level), dtype=np.uint8)
+        padded[0:statesArray.shape[0], 0:statesArray.shape[1]] = statesArray != 0
+
+        self.root = self.__fromArray(padded, level)
+        self.x = x
+        self.y = y
+        self.generation = 0
+
+    # writes the cells of the world window with top left corner (x, y) and the size of
+    # statesArray into statesArray
+    def getStates(self, statesArray, x=0, y=0):
+        statesArray.fill(0)
+        self.__toArray(self.root, self.x - x, self.y - y, statesArray)
+
+    # returns the state of the cell at world coordinates (x, y)
+    def getCell(self, x, y):
+        node = self.root
+        i = x - self.x
+        j = y - self.y
+        if i < 0 or j < 0 or i >= (1 << node.level) or j >= (1 << node.level):
+            return 0
+
+        while node.level > 0:
+            if node.population == 0:
+                return 0
+            half = 1 << (node.level - 1)
+            if j < half:
+                node = node.nw if i < half else node.ne
+            else:
+                node = node.sw if i < half else node.se
+            i %= half
+            j %= half
+
+        return node.population
+
+    # sets the state of the cell at world coordinates (x, y), growing the world if needed
+    def setCell(self, x, y, state):
+        while not (self.x <= x < self.x + (1 << self.root.level) and self.y <= y < self.y + (1 << self.root.level)):
+            self.__expand()
+        self.root = self.__setCell(self.root, x - self.x, y - self.y, state)
+
+    # advances the world by 2^k generations
+    def stepPow2(self, k):
+
+        # grow the world until the pattern and everything it can reach in 2^k generations
+        # lies within the center of the root, which is the area the successor computes
+        while self.root.level < k + 3 or not self.__isPadded(self.root):
+            self.__expand()
+
+        quarter = 1 << (self.root.level - 2)
+        self.root = self.__successor(self.root, k)
+        self.x += quarter
+        self.y += quarter
+        self.generation += 1 << k
+
+        if self.getCacheSize() > self.maxCacheSize:
+            self.collectGarbage()
+
+    # advances the world by n generations using the binary representation of n
+    def advance(self, n):
+        k = 0
+        while n > 0:
+            if n & 1:
+                self.stepPow2(k)
+            n >>= 1
+            k += 1
+
+    # drops all memoized results and all nodes that aren't part of the current world
+    def collectGarbage(self):
+        self.__results = {}
+        self.__nodes = {}
+        self.__zeros = [self.__dead]
+        self.__keep(self.root)
+
+    # adds the nodes of the given tree back into the canonical node table
+    def __keep(self, node):
+        if node.level == 0:
+            return
+        key = (node.nw, node.ne, node.sw, node.se)
+        if key in self.__nodes:
+            return
+        self.__keep(node.nw)
+        self.__keep(node.ne)
+        self.__keep(node.sw)
+        self.__keep(node.se)
+        self.__nodes[key] = node
+
+    # builds a node from a square array with side length 2^level
+    def __fromArray(self, array, level):
+        if level == 0:
+            return self.__alive if array[0, 0] else self.__dead
+        if not array.any():
+            return self.zero(level)
+
+        half = 1 << (level - 1)
+        return self.join(self.__fromArray(array[0:half, 0:half], level - 1),
+                         self.__fromArray(array[0:half, half:], level - 1),
+                         self.__fromArray(array[half:, 0:half], level - 1),
+                         self.__fromArray(array[half:, half:], level - 1))
+
+    # writes the living cells of node, whose top left cell is at (i, j) in statesArray, into statesArray
+    def __toArray(self, node, i, j, statesArray):
+        size = 1 << node.level
+        if node.population == 0 or i >= statesArray.shape[1] or j >= statesArray.shape[0] or i + size <= 0 or j + size <= 0:
+            return
+        if node.level == 0:
+            statesArray[j, i] = 1
+            return
+
+        half = size >> 1
+        self.__toArray(node.nw, i, j, statesArray)
+        self.__toArray(node.ne, i + half, j, statesArray)
+        self.__toArray(node.sw, i, j + half, statesArray)
+        self.__toArray(node.se, i + half, j + half, statesArray)
+
+    def __setCell(self, node, i, j, state):
+        if node.level == 0:
+            return self.__alive if state else self.__dead
+
+        half = 1 << (node.level - 1)
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        if j < half:
+            if i < half:
+                nw = self.__setCell(nw, i, j, state)
+            else:
+                ne = self.__setCell(ne, i - half, j, state)
+        else:
+            if i < half:
+                sw = self.__setCell(sw, i, j - half, state)
+            else:
+                se = self.__setCell(se, i - half, j - half, state)
+
+        return self.join(nw, ne, sw, se)
+
+    # puts the root into the center of a node of the next level
+    def __expand(self):
+        r = self.root
+        z = self.zero(r.level - 1)
+        self.root = self.join(self.join(z, z, z, r.nw),
+                              self.join(z, z, r.ne, z),
+                              self.join(z, r.sw, z, z),
+                              self.join(r.se, z, z, z))
+        half = 1 << (r.level - 1)
+        self.x -= half
+        self.y -= half
+
+    # true if all living cells of node are within its center square of a quarter of its size
+    # (the innermost grandchild of each child). then no cell can leave the center square of half
+    # the size, which the successor returns, within the 2^(level-3) generations stepPow2 allows
+    def __isPadded(self, node):
+        return node.population == (node.nw.se.se.population + node.ne.sw.sw.population +
+                                   node.sw.ne.ne.population + node.se.nw.nw.population)
+
+    # computes the center 2x2 cells of a 4x4 node after one generation
+    def __life4x4(self, m):
+
+        cells = [[m.nw.nw, m.nw.ne, m.ne.nw, m.ne.ne],
+                 [m.nw.sw, m.nw.se, m.ne.sw, m.ne.se],
+                 [m.sw.nw, m.sw.ne, m.se.nw, m.se.ne],
+                 [m.sw.sw, m.sw.se, m.se.sw, m.se.se]]
+
+        result = []
+        for j in (1, 2):
+            for i in (1, 2):
+                n = 0
+                for dj in (-1, 0, 1):
+                    for di in (-1, 0, 1):
+                        n += cells[j + dj][i + di].population
+                n -= cells[j][i].population
+                if cells[j][i].population:
+                    result.append(self.__alive if n in self.survival else self.__dead)
+                else:
+                    result.append(self.__alive if n in self.birth else self.__dead)
+
+        return self.join(result[0], result[1], result[2], result[3])
+
+    # returns the center node (one level below m) after 2^j generations. j must be <= m.level-2
+    def __successor(self, m, j):
+
+        if m.population == 0:
+            return self.zero(m.level - 1)
+
+        key = (m, j)
+        result = self.__results.get(key)
+        if result is not None:
+            return result
+
+        if m.level == 2:
+            result = self.__life4x4(m)
+        else:
+            # the nine overlapping sub-squares are advanced by at most half of the generations
+            jj = min(j, m.level - 3)
+
+            c1 = self.__successor(m.nw, jj)
+            c2 = self.__successor(self.join(m.nw.ne, m.ne.nw, m.nw.se, m.ne.sw), jj)
+            c3 = self.__successor(m.ne, jj)
+            c4 = self.__successor(self.join(m.nw.sw, m.nw.se, m.sw.nw, m.sw.ne), jj)
+            c5 = self.__successor(self.join(m.nw.se, m.ne.sw, m.sw.ne, m.se.nw), jj)
+            c6 = self.__successor(self.join(m.ne.sw, m.ne.se, m.se.nw, m.se.ne), jj)
+            c7 = self.__successor(m.sw, jj)
+            c8 = self.__successor(self.join(m.sw.ne, m.se.nw, m.sw.se, m.se.sw), jj)
+            c9 = self.__successor(m.se, jj)
+
+            if j < m.level - 2:
+                # the nine parts have already advanced by 2^j generations, take their centers
+                result = self.join(self.join(c1.se, c2.sw, c4.ne, c5.nw),
+                                   self.join(c2.se, c3.sw, c5.ne, c6.nw),
+                                   self.join(c4.se, c5.sw, c7.ne, c8.nw),
+                                   self.join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                # the nine parts have advanced by half of the generations, advance again
+                result = self.join(self.__successor(self.join(c1, c2, c4, c5), jj),
+                                   self.__successor(self.join(c2, c3, c5, c6), jj),
+                                   self.__successor(self.join(c4, c5, c7, c8), jj),
+                                   self.__successor(self.join(c5, c6, c8, c9), jj))
+
+        self.__results[key] = result
+        return result
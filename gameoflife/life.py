@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Vectorized stepping of Life-like cellular automata (Conway's game of life and relatives)
+https://en.wikipedia.org/wiki/Life-like_cellular_automaton
+
+Rules are given as B/S rulestrings, e.g. "B3/S23" (Conway), "B36/S23" (HighLife) or
+"B2/S" (Seeds), and are compiled into a lookup table that maps (state, neighbor count)
+to the next state. This module doesn't open a window and can be used headless.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import numpy as np
+
+
+# some well known rules
+ruleConway    = "B3/S23"
+ruleHighLife  = "B36/S23"
+ruleSeeds     = "B2/S"
+ruleDayNight  = "B3678/S34678"
+
+
+# parses a rulestring and returns the sets of neighbor counts for birth and survival.
+# accepts "B3/S23", "S23/B3" (case insensitive) and the traditional "23/3" notation (survival/birth)
+def parseRule( ruleString ):
+
+    parts = ruleString.replace(" ", "").upper().split("/")
+    if len(parts) != 2:
+        raise ValueError("invalid rulestring '" + ruleString + "'")
+
+    birth = None
+    survival = None
+
+    if parts[0][:1] in ("B", "S") or parts[1][:1] in ("B", "S"):
+        for part in parts:
+            if part[:1] == "B" and birth is None:
+                birth = part[1:]
+            elif part[:1] == "S" and survival is None:
+                survival = part[1:]
+            else:
+                raise ValueError("invalid rulestring '" + ruleString + "'")
+    else:
+        survival, birth = parts
+
+    for digits in (birth, survival):
+        for c in digits:
+            if c not in "012345678":
+                raise ValueError("invalid neighbor count '" + c + "' in rulestring '" + ruleString + "'")
+
+    return set(int(c) for c in birth), set(int(c) for c in survival)
+
+
+# creates the lookup table for a rulestring. the table is a flat uint8 array of length 18,
+# the next state of a cell is ruleTable[state*9 + numNeighbors]
+def makeRuleTable( ruleString ):
+
+    birth, survival = parseRule(ruleString)
+
+    ruleTable = np.zeros(18, dtype=np.uint8)
+    for n in birth:
+        ruleTable[n] = 1
+    for n in survival:
+        ruleTable[9 + n] = 1
+
+    return ruleTable
+
+
+# returns (destination, source) slice pairs along one axis of length size for an offset
+# of -1, 0 or 1. with wrap the cells at the border get their neighbors from the opposite border.
+def __shiftSlices( size, offset, wrap ):
+
+    if offset == 0:
+        return [(slice(0, size), slice(0, size))]
+    elif offset == 1:
+        pairs = [(slice(0, size-1), slice(1, size))]
+        if wrap:
+            pairs.append((slice(size-1, size), slice(0, 1)))
+    else:
+        pairs = [(slice(1, size), slice(0, size-1))]
+        if wrap:
+            pairs.append((slice(0, 1), slice(size-1, size)))
+
+    return pairs
+
+
+# counts the living neighbors of all cells with array slicing.
+# wrap: if False cells outside the board are dead, if True the board is a torus
+def countNeighborsFast( statesArray, neighborsArray, wrap=False ):
+    neighborsArray.fill(0)
+
+    numY = statesArray.shape[0]
+    numX = statesArray.shape[1]
+
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dy == 0 and dx == 0:
+                continue
+            for dstY, srcY in __shiftSlices(numY, dy, wrap):
+                for dstX, srcX in __shiftSlices(numX, dx, wrap):
+                    neighborsArray[dstY, dstX] += statesArray[srcY, srcX]
+
+    return
+
+
+# computes the next generation of statesArray into statesBufferArray for the rule in ruleTable
+# (see makeRuleTable). neighborsArray is used as scratch space, no temporary arrays are allocated.
+# all arrays must be uint8 arrays of the same shape.
+def updateStatesVectorized( statesArray, statesBufferArray, neighborsArray, ruleTable, wrap=False ):
+
+    countNeighborsFast(statesArray, neighborsArray, wrap)
+
+    # table index = state*9 + neighbors, computed in place
+    np.multiply(statesArray, 9, out=statesBufferArray)
+    np.add(neighborsArray, statesBufferArray, out=neighborsArray)
+
+    np.take(ruleTable, neighborsArray, out=statesBufferArray, mode='clip')
+
+    return
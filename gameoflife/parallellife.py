@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Multi-core game of life stepping
+
+The board is split into horizontal bands that are stepped by a pool of persistent worker
+processes. Both boards (current and next generation) live in shared memory with one row and
+column of ghost cells around them. Workers read the neighbor rows of the adjacent bands
+directly from the shared board and write the ghost cells for the rows they own (the halo
+exchange), so no arrays are pickled or copied per step. A barrier separates the generations.
+
+Run this file to benchmark the scaling from 1 to N workers:
+    python parallellife.py numCellsY numCellsX maxWorkers generations
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import sys
+import os
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from life import makeRuleTable, countNeighborsFast
+
+
+# main function of a worker process. steps rows y0 to y1-1 of the board
+# names:       names of the shared memory blocks of the two boards
+# shape:       shape of the boards including the ghost cells
+# command:     shared value, number of generations to compute or -1 to quit
+# parity:      shared value, index of the board holding the current generation
+# barrier:     barrier of all workers and the main process, waited on before and after a command
+# stepBarrier: barrier of the workers, waited on between two generations
+def stepBandWorker( names, shape, y0, y1, ruleTable, wrap, command, parity, barrier, stepBarrier ):
+
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    boards = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in blocks]
+
+    numY = shape[0] - 2
+    numX = shape[1] - 2
+
+    # rows y0 to y1-1 of the board are rows y0+1 to y1 of the array with ghost cells
+    neighbors = np.zeros((y1 - y0 + 2, shape[1]), dtype=np.uint8)
+    inner = neighbors[1:-1, 1:-1]
+
+    while True:
+        barrier.wait()
+        n = command.value
+        if n < 0:
+            break
+
+        current = parity.value
+        for i in range(n):
+            states = boards[current]
+            nextStates = boards[1 - current]
+
+            view = states[y0:y1+2]
+            band = nextStates[y0+1:y1+1, 1:numX+1]
+
+            countNeighborsFast(view, neighbors)
+            np.multiply(view[1:-1, 1:-1], 9, out=band)
+            np.add(inner, band, out=inner)
+            np.take(ruleTable, inner, out=band, mode='clip')
+
+            # halo exchange: update the ghost cells that are copies of the rows we own
+            if wrap:
+                nextStates[y0+1:y1+1, 0] = nextStates[y0+1:y1+1, numX]
+                nextStates[y0+1:y1+1, numX+1] = nextStates[y0+1:y1+1, 1]
+                if y0 == 0:
+                    nextStates[numY+1] = nextStates[1]
+                if y1 == numY:
+                    nextStates[0] = nextStates[numY]
+
+            current = 1 - current
+            stepBarrier.wait()
+
+        barrier.wait()
+
+    del boards
+    for block in blocks:
+        block.close()
+
+
+# ParallelLife class. Owns the shared boards and the worker processes
+class ParallelLife:
+
+    # constructor.
+    # numCellsY, numCellsX: board size in cells
+    # rule:                 B/S rulestring (see life.py)
+    # wrap:                 if False cells outside the board are dead, if True the board is a torus
+    # numWorkers:           number of worker processes, defaults to the number of cpus
+    def __init__(self, numCellsY, numCellsX, rule="B3/S23", wrap=False, numWorkers=None):
+
+        if numWorkers is None:
+            numWorkers = os.cpu_count()
+        numWorkers = max(1, min(numWorkers, numCellsY))
+
+        self.numCellsY = numCellsY
+        self.numCellsX = numCellsX
+        self.wrap = wrap
+        self.numWorkers = numWorkers
+        self.generation = 0
+
+        shape = (numCellsY + 2, numCellsX + 2)
+        self.__blocks = [shared_memory.SharedMemory(create=True, size=shape[0]*shape[1]) for i in range(2)]
+        self.__boards = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in self.__blocks]
+        for board in self.__boards:
+            board.fill(0)
+
+        self.__command = mp.Value('l', 0, lock=False)
+        self.__parity = mp.Value('i', 0, lock=False)
+        self.__barrier = mp.Barrier(numWorkers + 1)
+        stepBarrier = mp.Barrier(numWorkers)
+
+        names = [block.name for block in self.__blocks]
+        ruleTable = makeRuleTable(rule)
+
+        self.__workers = []
+        for w in range(numWorkers):
+            y0 = numCellsY * w // numWorkers
+            y1 = numCellsY * (w + 1) // numWorkers
+            worker = mp.Process(target=stepBandWorker,
+                                args=(names, shape, y0, y1, ruleTable, wrap,
+                                      self.__command, self.__parity, self.__barrier, stepBarrier),
+                                daemon=True)
+            worker.start()
+            self.__workers.append(worker)
+
+    # copies a uint8 states array of the board's size into the shared board
+    def setStates(self, statesArray):
+        board = self.__boards[self.__parity.value]
+        board[1:-1, 1:-1] = statesArray
+        self.__updateGhostCells(board)
+
+    # writes the shared board into a uint8 states array of the board's size
+    def getStates(self, statesArray):
+        statesArray[:, :] = self.__boards[self.__parity.value][1:-1, 1:-1]
+
+    # advances the board by n generations
+    def advance(self, n):
+        if n <= 0:
+            return
+        self.__command.value = n
+        self.__barrier.wait()   # start
+        self.__barrier.wait()   # done
+        self.__parity.value = (self.__parity.value + n) % 2
+        self.generation += n
+
+    def step(self):
+        self.advance(1)
+
+    # stops the workers and frees the shared memory
+    def close(self):
+        if self.__workers:
+            self.__command.value = -1
+            self.__barrier.wait()
+            for worker in self.__workers:
+                worker.join()
+            self.__workers = []
+
+        self.__boards = []
+        for block in self.__blocks:
+            block.close()
+            block.unlink()
+        self.__blocks = []
+
+    def __updateGhostCells(self, board):
+        if self.wrap:
+            board[:, 0] = board[:, self.numCellsX]
+            board[:, self.numCellsX+1] = board[:, 1]
+            board[0] = board[self.numCellsY]
+            board[self.numCellsY+1] = board[1]
+        else:
+            board[:, 0] = 0
+            board[:, self.numCellsX+1] = 0
+            board[0] = 0
+            board[self.numCellsY+1] = 0
+
+
+# measures the time per generation for 1 to maxWorkers workers and prints the
+# speedup and the scaling efficiency (speedup / number of workers)
+def benchmark( numCellsY, numCellsX, maxWorkers, generations ):
+
+    states = (np.random.default_rng(0).random((numCellsY, numCellsX)) < 0.2).astype(np.uint8)
+    t1 = None
+
+    numWorkers = 1
+    while numWorkers <= maxWorkers:
+        life = ParallelLife(numCellsY, numCellsX, numWorkers=numWorkers)
+        life.setStates(states)
+        life.advance(1)     # warm up
+
+        start = time.perf_counter()
+        life.advance(generations)
+        t = (time.perf_counter() - start) / generations
+        life.close()
+
+        if t1 is None:
+            t1 = t
+        print("workers: %3d   time per generation: %8.2f ms   speedup: %5.2f   efficiency: %4.0f %%"
+              % (numWorkers, t*1000, t1/t, 100*t1/(t*numWorkers)))
+
+        if numWorkers == maxWorkers:
+            break
+        numWorkers = min(2*numWorkers, maxWorkers)
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) != 5:
+        print("Usage: ", sys.argv[0], " numCellsY numCellsX maxWorkers generations")
+        sys.exit()
+
+    benchmark(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))
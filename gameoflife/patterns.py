@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Board initialization and pattern files for game of life
+
+Seeded random initialization with a NumPy Generator and streaming loaders and savers for the
+RLE (.rle) and plaintext (.cells) pattern formats. Patterns are written directly into a region
+of a uint8 states array, row by row, without building intermediate lists of cells.
+https://conwaylife.com/wiki/Run_Length_Encoded
+https://conwaylife.com/wiki/Plaintext
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import re
+import numpy as np
+
+
+rleToken = re.compile(r"(\d*)([^\d\s])")
+rleHeader = re.compile(r"\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*([^\s,]+))?", re.IGNORECASE)
+rleMaxLineLength = 70
+
+
+# fills statesArray with random cells, each alive with probability density.
+# the same seed always gives the same board
+def initStatesRandom( statesArray, density=0.2, seed=None ):
+    rng = np.random.default_rng(seed)
+    statesArray[:, :] = rng.random(statesArray.shape) < density
+
+
+# sets the cells of row j from column i to i+n-1 to 1, clipped to the array
+def __setRun( statesArray, i, j, n ):
+    if j < 0 or j >= statesArray.shape[0]:
+        return
+    i0 = max(i, 0)
+    i1 = min(i + n, statesArray.shape[1])
+    if i1 > i0:
+        statesArray[j, i0:i1] = 1
+
+
+# loads an RLE pattern from the file at path into statesArray, the pattern's top left cell at
+# column x and row y. cells outside the array are skipped. returns (width, height, rule) from
+# the header, rule is None if the header doesn't have one.
+def loadRle( path, statesArray, x=0, y=0 ):
+    width = height = 0
+    rule = None
+    i = x
+    j = y
+    pendingCount = ""
+
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            if line.lstrip().lower().startswith("x"):
+                match = rleHeader.match(line)
+                if match:
+                    width = int(match.group(1))
+                    height = int(match.group(2))
+                    rule = match.group(3)
+                    continue
+
+            # a run count may be split from its tag at the end of a line
+            line = pendingCount + line.strip()
+            trailing = re.search(r"\d+$", line)
+            pendingCount = trailing.group(0) if trailing else ""
+            if trailing:
+                line = line[:trailing.start()]
+
+            for match in rleToken.finditer(line):
+                n = int(match.group(1)) if match.group(1) else 1
+                tag = match.group(2)
+
+                if tag == "!":
+                    return width, height, rule
+                elif tag == "$":
+                    i = x
+                    j += n
+                elif tag == "b" or tag == ".":
+                    i += n
+                else:
+                    __setRun(statesArray, i, j, n)
+                    i += n
+
+    return width, height, rule
+
+
+# saves the cells of statesArray as an RLE pattern to the file at path
+def saveRle( statesArray, path, rule="B3/S23" ):
+
+    with open(path, "w") as f:
+        f.write("x = %d, y = %d, rule = %s\n" % (statesArray.shape[1], statesArray.shape[0], rule))
+
+        line = ""
+        lastRow = 0
+        for j in range(statesArray.shape[0]):
+            row = statesArray[j] != 0
+
+            # start and end columns of the runs of living cells
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], row, [False])).astype(np.int8)))
+            if len(edges) == 0:
+                continue
+
+            tokens = []
+            if j > lastRow:
+                tokens.append(__rleRun(j - lastRow, "$"))
+            lastRow = j
+
+            end = 0
+            for k in range(0, len(edges), 2):
+                if edges[k] > end:
+                    tokens.append(__rleRun(edges[k] - end, "b"))
+                tokens.append(__rleRun(edges[k+1] - edges[k], "o"))
+                end = edges[k+1]
+
+            for token in tokens:
+                if len(line) + len(token) > rleMaxLineLength:
+                    f.write(line + "\n")
+                    line = ""
+                line += token
+
+        # the terminating "!" counts towards the line length as well
+        if len(line) + 1 > rleMaxLineLength:
+            f.write(line + "\n")
+            line = ""
+        f.write(line + "!\n")
+
+
+def __rleRun( n, tag ):
+    return tag if n == 1 else str(n) + tag
+
+
+# loads a plaintext pattern from the file at path into statesArray, the pattern's top left cell
+# at column x and row y. cells outside the array are skipped. returns (width, height)
+def loadPlaintext( path, statesArray, x=0, y=0 ):
+    width = 0
+    j = y
+
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("!"):
+                continue
+            line = line.rstrip("\r\n")
+            width = max(width, len(line))
+
+            if 0 <= j < statesArray.shape[0] and x < statesArray.shape[1]:
+                row = np.frombuffer(line.encode("ascii"), dtype=np.uint8) == ord("O")
+                i0 = max(x, 0)
+                i1 = min(x + len(row), statesArray.shape[1])
+                if i1 > i0:
+                    statesArray[j, i0:i1] = row[i0-x:i1-x]
+            j += 1
+
+    return width, j - y
+
+
+# saves the cells of statesArray as a plaintext pattern to the file at path
+def savePlaintext( statesArray, path, name=None ):
+    symbols = np.array([ord("."), ord("O")], dtype=np.uint8)
+
+    with open(path, "w") as f:
+        if name is not None:
+            f.write("!Name: " + name + "\n")
+        for j in range(statesArray.shape[0]):
+            f.write(symbols[(statesArray[j] != 0).astype(np.uint8)].tobytes().decode("ascii") + "\n")
+
+
+# loads a pattern file into statesArray, the format is chosen by the file extension
+# (.rle or .cells). if x or y is None, the pattern is centered in that direction.
+def loadPattern( path, statesArray, x=None, y=None ):
+    if path.lower().endswith(".rle"):
+        width, height = __rleSize(path)
+        load = loadRle
+    else:
+        width, height = __plaintextSize(path)
+        load = loadPlaintext
+
+    if x is None:
+        x = (statesArray.shape[1] - width) // 2
+    if y is None:
+        y = (statesArray.shape[0] - height) // 2
+
+    load(path, statesArray, x, y)
+
+
+# reads the pattern size from the header of an RLE file
+def __rleSize( path ):
+    with open(path, "r") as f:
+        for line in f:
+            match = rleHeader.match(line)
+            if match:
+                return int(match.group(1)), int(match.group(2))
+            if not line.startswith("#"):
+                break
+    return 0, 0
+
+
+# counts the width and height of a plaintext file
+def __plaintextSize( path ):
+    width = height = 0
+    with open(path, "r") as f:
+        for line in f:
+            if not line.startswith("!"):
+                width = max(width, len(line.rstrip("\r\n")))
+                height += 1
+    return width, height
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Memory-mapped recording and random-access replay of game of life histories
+
+Every generation is bit-packed (8 cells per byte). Every keyframeInterval-th generation is
+stored as a keyframe, the generations in between as the XOR with the previous generation.
+Frames are zlib compressed and appended to a memory-mapped data file. A second memory-mapped
+file holds the index (offset and length of each frame), so a reader can seek to generation N
+by decoding the keyframe before it and at most keyframeInterval-1 delta frames. The header
+holds the number of frames and is updated after every appended frame, so a recording that was
+never closed (e.g. the program crashed) can still be read up to its last complete frame.
+
+Run this file to export a recorded generation as an RLE pattern:
+    python recorder.py historyFile generation outputFile
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import sys
+import os
+import struct
+import zlib
+import numpy as np
+
+
+headerFormat = "<8sQQQQ"    # magic, numCellsY, numCellsX, keyframeInterval, numFrames
+headerMagic = b"GOLHIST2"
+headerSize = 64
+
+
+# HistoryRecorder class. Appends generations of a states array to a history file
+class HistoryRecorder:
+
+    # constructor. creates (or overwrites) the files path and path + ".idx"
+    # keyframeInterval: every keyframeInterval-th generation is stored as a keyframe
+    # compressLevel:    zlib compression level of the frames
+    def __init__(self, path, numCellsY, numCellsX, keyframeInterval=64, compressLevel=1):
+
+        self.path = path
+        self.numCellsY = numCellsY
+        self.numCellsX = numCellsX
+        self.keyframeInterval = keyframeInterval
+        self.compressLevel = compressLevel
+        self.numFrames = 0
+
+        self.__dataSize = headerSize
+        self.__data = self.__createMap(path, headerSize + (1 << 20))
+        self.__writeHeader()
+
+        self.__index = self.__createMap(path + ".idx", 1024 * 16)
+        self.__previous = None
+
+    # appends the next generation
+    def append(self, statesArray):
+        packed = np.packbits(statesArray != 0)
+
+        if self.numFrames % self.keyframeInterval == 0:
+            frame = packed
+        else:
+            frame = np.bitwise_xor(packed, self.__previous)
+        self.__previous = packed
+
+        data = zlib.compress(frame.tobytes(), self.compressLevel)
+
+        offset = self.__dataSize
+        self.__data = self.__ensureSize(self.path, self.__data, offset + len(data))
+        self.__data[offset:offset + len(data)] = np.frombuffer(data, dtype=np.uint8)
+        self.__dataSize += len(data)
+
+        entry = 16 * self.numFrames
+        self.__index = self.__ensureSize(self.path + ".idx", self.__index, entry + 16)
+        self.__index[entry:entry + 16] = np.array([offset, len(data)], dtype="<u8").view(np.uint8)
+        self.numFrames += 1
+        self.__writeHeader()
+
+    # writes everything to disk and cuts the files to their used size
+    def close(self):
+        if self.__data is None:
+            return
+        self.__data.flush()
+        self.__index.flush()
+        self.__data = None
+        self.__index = None
+        os.truncate(self.path, self.__dataSize)
+        os.truncate(self.path + ".idx", 16 * self.numFrames)
+
+    # writes the header with the current number of frames. the frame count is written last,
+    # after the frame and its index entry, so it never counts an incomplete frame
+    def __writeHeader(self):
+        self.__data[0:struct.calcsize(headerFormat)] = np.frombuffer(
+            struct.pack(headerFormat, headerMagic, self.numCellsY, self.numCellsX, self.keyframeInterval, self.numFrames),
+            dtype=np.uint8)
+
+    def __createMap(self, path, size):
+        with open(path, "wb") as f:
+            f.truncate(size)
+        return np.memmap(path, dtype=np.uint8, mode="r+")
+
+    # returns a map of the file with at least size bytes, doubling the file if it is too small
+    def __ensureSize(self, path, fileMap, size):
+        if size <= len(fileMap):
+            return fileMap
+        newSize = max(2 * len(fileMap), size)
+        fileMap.flush()
+        del fileMap
+        os.truncate(path, newSize)
+        return np.memmap(path, dtype=np.uint8, mode="r+")
+
+
+# HistoryReader class. Reads generations of a history file written by HistoryRecorder
+class HistoryReader:
+
+    def __init__(self, path):
+
+        self.__data = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, self.numCellsY, self.numCellsX, self.keyframeInterval, numFrames = struct.unpack(
+            headerFormat, self.__data[0:struct.calcsize(headerFormat)].tobytes())
+        if magic != headerMagic:
+            raise ValueError("'" + path + "' is not a game of life history file")
+
+        if os.path.getsize(path + ".idx") > 0:
+            self.__index = np.memmap(path + ".idx", dtype="<u8", mode="r").reshape(-1, 2)
+        else:
+            self.__index = np.zeros((0, 2), dtype="<u8")
+        # the index of a recording that wasn't closed is longer than the number of frames
+        self.numFrames = min(numFrames, self.__index.shape[0])
+
+        # last decoded generation, replaying forward only decodes one delta per generation
+        self.__current = None
+        self.__currentFrame = -1
+
+    # writes generation n into statesArray (a new array if None) and returns it
+    def getFrame(self, n, statesArray=None):
+        if n < 0 or n >= self.numFrames:
+            raise IndexError("generation " + str(n) + " is not in the history (0 to " + str(self.numFrames-1) + ")")
+
+        keyframe = n - n % self.keyframeInterval
+        if self.__currentFrame < keyframe or self.__currentFrame > n:
+            self.__current = self.__decode(keyframe)
+            self.__currentFrame = keyframe
+
+        while self.__currentFrame < n:
+            self.__currentFrame += 1
+            np.bitwise_xor(self.__current, self.__decode(self.__currentFrame), out=self.__current)
+
+        if statesArray is None:
+            statesArray = np.zeros((self.numCellsY, self.numCellsX), dtype=np.uint8)
+        statesArray[:, :] = np.unpackbits(self.__current, count=self.numCellsY*self.numCellsX).reshape(self.numCellsY, self.numCellsX)
+        return statesArray
+
+    def __decode(self, n):
+        offset, length = self.__index[n]
+        data = zlib.decompress(self.__data[offset:offset + length].tobytes())
+        return np.frombuffer(data, dtype=np.uint8).copy()
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) != 4:
+        print("Usage: ", sys.argv[0], " historyFile generation outputFile")
+        print("  exports the given generation of a recorded history as RLE pattern")
+        sys.exit()
+
+    from patterns import saveRle
+
+    reader = HistoryReader(sys.argv[1])
+    print(reader.numFrames, "generations of", reader.numCellsX, "x", reader.numCellsY, "cells")
+    saveRle(reader.getFrame(int(sys.argv[2])), sys.argv[3])
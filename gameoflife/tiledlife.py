@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Sparse, tiled game of life engine for unbounded worlds
+
+The world is stored as square chunks of chunkSize x chunkSize cells in a dict keyed by the
+chunk coordinates. Only chunks whose neighborhood changed in the last generation are stepped,
+chunks are allocated when a pattern grows into them and freed after they have been dead for a
+while, so the cost of a generation scales with the active area instead of the bounding box.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+
+"""
+
+import hashlib
+import struct
+import numpy as np
+from life import parseRule, makeRuleTable, updateStatesVectorized
+
+
+# offsets of a chunk's eight neighbor chunks
+neighborOffsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+# TiledLife class. Stores the living cells in chunks and advances them generation by generation
+class TiledLife:
+
+    # constructor.
+    # rule:      B/S rulestring (see life.py). rules with birth on 0 neighbors are not supported
+    # chunkSize: side length of a chunk in cells
+    # freeAfter: number of generations a chunk must be dead before it is freed
+    def __init__(self, rule="B3/S23", chunkSize=64, freeAfter=16):
+
+        birth, survival = parseRule(rule)
+        if 0 in birth:
+            raise ValueError("an unbounded world doesn't support rules with birth on 0 neighbors")
+
+        self.ruleTable = makeRuleTable(rule)
+        self.chunkSize = chunkSize
+        self.freeAfter = freeAfter
+
+        self.chunks = {}        # (cy, cx) -> uint8 array of chunkSize x chunkSize cells
+        self.dirty = set()      # chunks that changed in the last generation or were edited
+        self.deadFor = {}       # (cy, cx) -> number of generations the chunk has been dead
+        self.generation = 0
+
+        # preallocated buffers for stepping one chunk with a one cell border of its neighbors
+        self.__padded = np.zeros((chunkSize+2, chunkSize+2), dtype=np.uint8)
+        self.__paddedBuffer = np.zeros((chunkSize+2, chunkSize+2), dtype=np.uint8)
+        self.__neighbors = np.zeros((chunkSize+2, chunkSize+2), dtype=np.uint8)
+
+    # returns the chunks that have to be stepped: the dirty chunks and their neighbors
+    def getActiveChunks(self):
+        active = set()
+        for cy, cx in self.dirty:
+            active.add((cy, cx))
+            for dy, dx in neighborOffsets:
+                active.add((cy+dy, cx+dx))
+        return active
+
+    def getPopulation(self):
+        return sum(int(np.count_nonzero(chunk)) for chunk in self.chunks.values())
+
+    # returns a hashable key of the whole world: a hash of the living chunks and their positions
+    def getStateKey(self):
+        h = hashlib.blake2b(digest_size=16)
+        for key in sorted(self.chunks.keys()):
+            chunk = self.chunks[key]
+            if chunk.any():
+                h.update(struct.pack("<qq", key[0], key[1]))
+                h.update(np.packbits(chunk).tobytes())
+        return h.digest()
+
+    # returns the state of the cell at world coordinates (x, y)
+    def getCell(self, x, y):
+        chunk = self.chunks.get((y // self.chunkSize, x // self.chunkSize))
+        if chunk is None:
+            return 0
+        return chunk[y % self.chunkSize, x % self.chunkSize]
+
+    # sets the state of the cell at world coordinates (x, y)
+    def setCell(self, x, y, state):
+        key = (y // self.chunkSize, x // self.chunkSize)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if state == 0:
+                return
+            chunk = np.zeros((self.chunkSize, self.chunkSize), dtype=np.uint8)
+            self.chunks[key] = chunk
+        chunk[y % self.chunkSize, x % self.chunkSize] = state
+        self.dirty.add(key)
+        self.__updateDeadFor(key)
+
+    # copies the cells of statesArray into the world, its top left cell at world coordinates (x, y)
+    def setStates(self, statesArray, x=0, y=0):
+        size = self.chunkSize
+        for cy in range(y // size, (y + statesArray.shape[0] - 1) // size + 1):
+            for cx in range(x // size, (x + statesArray.shape[1] - 1) // size + 1):
+
+                # overlap of chunk and array in world coordinates
+                y0 = max(cy*size, y)
+                y1 = min((cy+1)*size, y + statesArray.shape[0])
+                x0 = max(cx*size, x)
+                x1 = min((cx+1)*size, x + statesArray.shape[1])
+
+                region = statesArray[y0-y:y1-y, x0-x:x1-x]
+                chunk = self.chunks.get((cy, cx))
+                if chunk is None:
+                    if not region.any():
+                        continue
+                    chunk = np.zeros((size, size), dtype=np.uint8)
+                    self.chunks[(cy, cx)] = chunk
+
+                chunk[y0-cy*size:y1-cy*size, x0-cx*size:x1-cx*size] = region
+                self.dirty.add((cy, cx))
+                self.__updateDeadFor((cy, cx))
+
+    # writes the world window with top left corner (x, y) and the size of statesArray into statesArray
+    def getStates(self, statesArray, x=0, y=0):
+        statesArray.fill(0)
+        size = self.chunkSize
+        for cy in range(y // size, (y + statesArray.shape[0] - 1) // size + 1):
+            for cx in range(x // size, (x + statesArray.shape[1] - 1) // size + 1):
+                chunk = self.chunks.get((cy, cx))
+                if chunk is None:
+                    continue
+
+                y0 = max(cy*size, y)
+                y1 = min((cy+1)*size, y + statesArray.shape[0])
+                x0 = max(cx*size, x)
+                x1 = min((cx+1)*size, x + statesArray.shape[1])
+
+                statesArray[y0-y:y1-y, x0-x:x1-x] = chunk[y0-cy*size:y1-cy*size, x0-cx*size:x1-cx*size]
+
+    # advances the world by one generation
+    def step(self):
+
+        newChunks = {}
+        newDirty = set()
+
+        # compute all new chunks from the old generation before replacing anything
+        for key in self.getActiveChunks():
+            result = self.__stepChunk(key)
+            chunk = self.chunks.get(key)
+
+            if chunk is None:
+                if result.any():
+                    newChunks[key] = result.copy()
+                    newDirty.add(key)
+            elif not np.array_equal(chunk, result):
+                newChunks[key] = result.copy()
+                newDirty.add(key)
+
+        self.chunks.update(newChunks)
+        self.dirty = newDirty
+        self.generation += 1
+
+        self.__freeDeadChunks()
+
+    # advances the world by n generations
+    def advance(self, n):
+        for i in range(n):
+            self.step()
+
+    # computes the next generation of a chunk. returns a view into a buffer that is
+    # overwritten by the next call
+    def __stepChunk(self, key):
+        cy, cx = key
+        padded = self.__padded
+        padded.fill(0)
+
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            padded[1:-1, 1:-1] = chunk
+
+        # copy the border cells of the neighbor chunks
+        for dy, dx in neighborOffsets:
+            neighbor = self.chunks.get((cy+dy, cx+dx))
+            if neighbor is None:
+                continue
+            dst = (slice(0, 1) if dy < 0 else slice(-1, None) if dy > 0 else slice(1, -1),
+                   slice(0, 1) if dx < 0 else slice(-1, None) if dx > 0 else slice(1, -1))
+            src = (slice(-1, None) if dy < 0 else slice(0, 1) if dy > 0 else slice(None),
+                   slice(-1, None) if dx < 0 else slice(0, 1) if dx > 0 else slice(None))
+            padded[dst] = neighbor[src]
+
+        updateStatesVectorized(padded, self.__paddedBuffer, self.__neighbors, self.ruleTable)
+
+        return self.__paddedBuffer[1:-1, 1:-1]
+
+    # starts or stops counting the dead generations of a chunk that changed
+    def __updateDeadFor(self, key):
+        if self.chunks[key].any():
+            self.deadFor.pop(key, None)
+        else:
+            self.deadFor[key] = 0
+
+    # frees chunks that have been dead for freeAfter generations. only chunks that changed
+    # (in the step or by an edit) can have died, so the other chunks don't need to be checked
+    def __freeDeadChunks(self):
+        for key in self.dirty:
+            self.__updateDeadFor(key)
+
+        for key in list(self.deadFor.keys()):
+            if key in self.dirty:
+                continue
+            self.deadFor[key] += 1
+            if self.deadFor[key] >= self.freeAfter:
+                del self.chunks[key]
+                del self.deadFor[key]
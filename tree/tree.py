@@ -31,29 +31,25 @@
 
 Tree object with drawing capability
 
+The tree is a complete tree stored implicitly: the nodes are numbered level by level starting
+with 0 at the root, so the children of node i are i*numChildren+1 to i*numChildren+numChildren
+and no node objects are needed. Per-node attributes are kept in flat NumPy arrays.
+
 required modules:
     pygame   https://pypi.org/project/pygame/
+    numpy    https://pypi.org/project/numpy/
  
 """
 
 import sys
 import pygame as pg
+import numpy as np
 from time import sleep
-import math
-
-# TreeNode class. A tree node connects to its children
-class TreeNode:
-
-    # Constructor: 
-    def __init__(self, depth = 0):
-        self.children = []
-        self.depth = depth
-
-    def isLeaf(self):
-        return len(self.children) == 0
+from collections import OrderedDict
+from treeshapes import iterInstancedBranches
 
 
-# Tree class. The tree is represented by a root TreeNode and has functions
+# Tree class. The tree is stored implicitly by node indices and has functions
 # to draw the tree.
 class Tree:
 
@@ -61,22 +57,99 @@ class Tree:
     # treeDepth:   specifies the depth of the tree and must be >= 1
     # numChildren: specifies the number of children of a node, must be >= 1
     def __init__(self, treeDepth, numChildren):
-        self.rootNode = self.__createTree(treeDepth, numChildren)
-
-    # creates the tree recursively and is called by the constructor. don't call from outside.
-    def __createTree(self, treeDepth, numChildren):
-        
-        node = TreeNode(treeDepth)
-
-        if (treeDepth > 1):
-            for i in range(numChildren):
-                node.children.append(self.__createTree(treeDepth-1, numChildren))
-        
-        return node
-
+        self.treeDepth = treeDepth
+        self.numChildren = numChildren
+
+        # index of the first node of each level (level 0 is the root) and of the node after the last level
+        levelSizes = [numChildren**level for level in range(treeDepth)]
+        self.levelStart = np.concatenate(([0], np.cumsum(levelSizes))).astype(np.int64)
+        self.numNodes = int(self.levelStart[-1])
+
+        self.__depth = None
+        self.__drawOrder = None    # (start node, end node, is leaf) of the branches in drawing order
+        self.__drawCache = None    # (parameters, node positions) of the last draw
+
+    # depth of each node: treeDepth for the root down to 1 for the leaves. the array is made on
+    # first use, so huge trees can be drawn with drawInstanced without allocating it
+    @property
+    def depth(self):
+        if self.__depth is None:
+            levelSizes = np.diff(self.levelStart)
+            self.__depth = np.repeat(np.arange(self.treeDepth, 0, -1).astype(np.min_scalar_type(self.treeDepth)), levelSizes)
+        return self.__depth
 
     def getTreeDepth(self):
-        return self.rootNode.depth
+        return self.treeDepth
+
+    def getNumNodes(self):
+        return self.numNodes
+
+    # returns the range of the children's indices of the given node (empty for leaves)
+    def getChildren(self, node):
+        if self.isLeaf(node):
+            return range(0)
+        first = node * self.numChildren + 1
+        return range(first, first + self.numChildren)
+
+    # returns the index of the parent of the given node, -1 for the root
+    def getParent(self, node):
+        if node == 0:
+            return -1
+        return (node - 1) // self.numChildren
+
+    def isLeaf(self, node):
+        return node >= self.levelStart[-2]
+
+    # returns the index of each node in depth-first (pre-order) order of the tree, the order in
+    # which the recursive drawing visits the nodes. computed level by level
+    def getPreorder(self):
+        k = self.numChildren
+        preorder = np.zeros(self.numNodes, dtype=np.int64)
+        for level in range(1, self.treeDepth):
+            nodes = np.arange(self.levelStart[level], self.levelStart[level+1])
+            subtreeSize = self.levelStart[self.treeDepth - level]   # nodes in the subtree of a node of this level
+            preorder[nodes] = preorder[(nodes - 1) // k] + 1 + ((nodes - 1) % k) * subtreeSize
+        return preorder
+
+    # computes the branches of the tree level by level, see draw for the parameters.
+    # returns the arrays (x0, y0, x1, y1, alpha): branch i goes from (x0[i], y0[i]) to (x1[i], y1[i])
+    # in direction alpha[i] and ends in node i+1
+    def getBranches(self, pos, angle, angleDelta, length, lengthScaling):
+        x, y, alpha = self.__getNodes(pos, angle, angleDelta, length, lengthScaling)
+        parents = np.arange(self.numNodes - 1) // self.numChildren
+        return x[parents], y[parents], x[1:], y[1:], alpha[1:]
+
+    # computes the position and the direction of the branch to every node level by level
+    def __getNodes(self, pos, angle, angleDelta, length, lengthScaling):
+        k = self.numChildren
+        x = np.zeros(self.numNodes)
+        y = np.zeros(self.numNodes)
+        alpha = np.zeros(self.numNodes)
+        x[0] = pos[0]
+        y[0] = pos[1]
+        alpha[0] = angle
+
+        # direction of the i-th child relative to its parent's direction
+        childAngles = -(angleDelta*(k-1)*0.5)
+        childDeltas = np.arange(k)*angleDelta
+
+        # the children of a level are the nodes of the next level in order, k per parent, so
+        # each level is computed on (parents, k) shaped views of the next level
+        levelStart = self.levelStart.tolist()
+        for level in range(1, self.treeDepth):
+            parents = slice(levelStart[level-1], levelStart[level])
+            children = slice(levelStart[level], levelStart[level+1])
+
+            # child direction, child's x = parent's x + branch length * cos( direction angle ), same for y
+            childAlpha = alpha[children].reshape(-1, k)
+            np.add(alpha[parents, None] + childAngles, childDeltas, out=childAlpha)
+            radians = np.radians(childAlpha)
+            np.add(x[parents, None], length * np.cos(radians), out=x[children].reshape(-1, k))
+            np.add(y[parents, None], length * np.sin(radians), out=y[children].reshape(-1, k))
+
+            length = length*lengthScaling
+
+        return x, y, alpha
 
     # draws the whole tree
     # pos:           (x,y)-position in the window, where to draw the root node
@@ -88,40 +161,151 @@ class Tree:
     # leafColor:     color of the tree's leaf branches
     # stepTime:      if > 0 each branch is drawn after a delay of stepTime seconds
     def draw(self, pos, angle, angleDelta, length, lengthScaling, innerColor, leafColor, stepTime = 0):
-        self.__drawTree(self.rootNode, pos, angle, angleDelta, length, lengthScaling, innerColor, leafColor, stepTime)
-
+        if self.numNodes == 1:
+            return
 
-    # draws a tree stored in the given TreeNode recursively. called by the draw function. 
-    def __drawTree(self, node, pos, angle, angleDelta, length, lengthScaling, innerColor, leafColor, stepTime = 0):
+        # branches in the order of the recursive drawing, so crossing branches overlap the same way
+        if self.__drawOrder is None:
+            order = np.argsort(self.getPreorder()[1:]) + 1
+            self.__drawOrder = list(zip(((order - 1) // self.numChildren).tolist(), order.tolist(),
+                                        (order >= self.levelStart[-2]).tolist()))
 
-        # get number of children
-        n = len(node.children)
+        # the node positions are kept until the parameters change
+        parameters = (tuple(pos), angle, angleDelta, length, lengthScaling)
+        if self.__drawCache is None or self.__drawCache[0] != parameters:
+            x, y, alpha = self.__getNodes(pos, angle, angleDelta, length, lengthScaling)
+            self.__drawCache = (parameters, list(zip(x.tolist(), y.tolist())))
+        points = self.__drawCache[1]
 
-        # if the current node has children, compute position of the child nodes and draw branches to children
-        for i in range(n):
+        for start, end, isLeaf in self.__drawOrder:
+            pg.draw.line(screen, leafColor if isLeaf else innerColor, points[start], points[end])
 
-            # compute direction of the child node (= direction of the branch)
-            alpha = angle - angleDelta*(n-1)*0.5 + i*angleDelta 
-
-            # compute child position
-            # child's x = parent's x  +  branch length * cos( direction angle )
-            # child's y = parent's y  +  branch length * sin( direction angle )
-            childPos = ( pos[0] + length * math.cos(math.radians(alpha)), pos[1] + length * math.sin(math.radians(alpha)) )
+            # delay next draw by stepTime seconds
+            if stepTime > 0:
+                pg.display.flip()
+                sleep(stepTime)
 
-            # draw branch 
-            if node.depth <= 2:
-                pg.draw.line(screen, leafColor, pos, childPos)  # leaf branch
-            else:
-                pg.draw.line(screen, innerColor, pos, childPos) # inner branch
+    # computes the branches like getBranches but skips the subtrees that can't be seen: the
+    # subtree of a node is culled when its reach (the remaining branch length down to the leaves)
+    # is below minLength pixels or the circle with this radius around the node lies outside
+    # viewRect = (left, top, width, height). returns (x0, y0, x1, y1, leaf) in depth-first order
+    def getVisibleBranches(self, pos, angle, angleDelta, length, lengthScaling, viewRect, minLength = 1.0):
+        k = self.numChildren
+        left, top, width, height = viewRect
+        childAngles = -(angleDelta*(k-1)*0.5)
+        i = np.arange(k)
+
+        # nodes of the current level that are not culled, with their pre-order indices
+        x = np.array([float(pos[0])])
+        y = np.array([float(pos[1])])
+        alpha = np.array([float(angle)])
+        preorder = np.zeros(1, dtype=np.int64)
+        branches = []
+
+        for level in range(1, self.treeDepth):
+
+            # reach of the subtrees of the parent level
+            reach = 0.0
+            branchLength = abs(length)
+            for j in range(self.treeDepth - level):
+                reach += branchLength
+                branchLength *= abs(lengthScaling)
+
+            dx = np.maximum(np.maximum(left - x, x - (left + width)), 0)
+            dy = np.maximum(np.maximum(top - y, y - (top + height)), 0)
+            visible = dx*dx + dy*dy <= reach*reach
+            if reach < minLength or not visible.any():
+                break
+            x = x[visible]
+            y = y[visible]
+            alpha = alpha[visible]
+            preorder = preorder[visible]
+
+            # children of the visible nodes, see getBranches
+            childAlpha = np.repeat(alpha, k) + childAngles + np.tile(i, len(x))*angleDelta
+            radians = np.radians(childAlpha)
+            parentX = np.repeat(x, k)
+            parentY = np.repeat(y, k)
+            childX = parentX + length * np.cos(radians)
+            childY = parentY + length * np.sin(radians)
+            preorder = np.repeat(preorder, k) + 1 + np.tile(i, len(x)) * self.levelStart[self.treeDepth - level]
+            branches.append((parentX, parentY, childX, childY, preorder))
+
+            x = childX
+            y = childY
+            alpha = childAlpha
+            length = length*lengthScaling
+
+        if not branches:
+            empty = np.zeros(0)
+            return empty, empty, empty, empty, np.zeros(0, dtype=bool)
+
+        x0, y0, x1, y1, preorder = (np.concatenate(arrays) for arrays in zip(*branches))
+        leaf = np.concatenate([np.full(len(b[0]), level == self.treeDepth - 1) for level, b in enumerate(branches, 1)])
+        order = np.argsort(preorder)
+        return x0[order], y0[order], x1[order], y1[order], leaf[order]
+
+    # draws the whole tree like draw, but skips subtrees that are smaller than minLength pixels
+    # or outside the screen (see getVisibleBranches)
+    def drawCulled(self, pos, angle, angleDelta, length, lengthScaling, innerColor, leafColor, stepTime = 0, minLength = 1.0):
+        x0, y0, x1, y1, leaf = self.getVisibleBranches(pos, angle, angleDelta, length, lengthScaling,
+                                                       screen.get_rect(), minLength)
+        self.__drawBranches(x0, y0, x1, y1, leaf, innerColor, leafColor, stepTime)
+
+    # draws the whole tree like draw, but computes the shape of a subtree only once per depth and
+    # places rotated and scaled instances of it (see treeshapes.py). maxShapeSize limits the
+    # number of branches of the instanced shape
+    def drawInstanced(self, pos, angle, angleDelta, length, lengthScaling, innerColor, leafColor, stepTime = 0, maxShapeSize = 4096):
+        for x0, y0, x1, y1, depth, leaf in iterInstancedBranches(self.treeDepth, self.numChildren, pos, angle, angleDelta,
+                                                                 length, lengthScaling, maxShapeSize):
+            self.__drawBranches(x0, y0, x1, y1, leaf, innerColor, leafColor, stepTime)
+
+    # draws the branches from (x0[i], y0[i]) to (x1[i], y1[i]) in the given order
+    def __drawBranches(self, x0, y0, x1, y1, isLeafBranch, innerColor, leafColor, stepTime):
+        starts = zip(x0.tolist(), y0.tolist())
+        ends = zip(x1.tolist(), y1.tolist())
+
+        for start, end, isLeaf in zip(starts, ends, isLeafBranch.tolist()):
+            pg.draw.line(screen, leafColor if isLeaf else innerColor, start, end)
 
             # delay next draw by stepTime seconds
             if stepTime > 0:
                 pg.display.flip()
                 sleep(stepTime)
-            
 
-            # draw child branches of the child node
-            self.__drawTree( node.children[i], childPos, alpha, angleDelta, length*lengthScaling, lengthScaling, innerColor, leafColor, stepTime)
+
+# FrameCache class. Keeps rendered frames keyed by their drawing parameters and drops the least
+# recently used frames when the frames take more than maxBytes
+class FrameCache:
+
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.numBytes = 0
+        self.__frames = OrderedDict()
+
+    # returns the frame for key or None
+    def get(self, key):
+        frame = self.__frames.get(key)
+        if frame is not None:
+            self.__frames.move_to_end(key)
+        return frame
+
+    # stores a copy of the surface as the frame for key
+    def put(self, key, surface):
+        if key in self.__frames:
+            return
+        frame = surface.copy()
+        self.__frames[key] = frame
+        self.numBytes += frame.get_bytesize() * frame.get_width() * frame.get_height()
+
+        while self.numBytes > self.maxBytes and len(self.__frames) > 1:
+            key, oldFrame = self.__frames.popitem(last=False)
+            self.numBytes -= oldFrame.get_bytesize() * oldFrame.get_width() * oldFrame.get_height()
+
+
+# rounds value to a multiple of step
+def quantize( value, step ):
+    return round(value / step) * step
 
 
 # colors definitions
@@ -137,6 +321,13 @@ winHeight = 800
 maxLength = 250       # branch length
 maxLengthScaling = 1  # maximum scaling of branch lenghts
 maxAngleDelta = 360   # maximum angles between branches of one tree node
+useInstancing = False # True: draw with self-similar instances of subtree shapes (Tree.drawInstanced)
+cullBranches = True   # True: skip subtrees smaller than minBranchLength pixels or outside the window (Tree.drawCulled)
+minBranchLength = 1.0 # with cullBranches, subtrees with less remaining branch length (in pixels) are skipped
+useFrameCache = True  # True: keep rendered frames for the quantized drawing parameters and reuse them
+frameCacheBytes = 256 * 1024 * 1024   # memory budget of the frame cache
+angleStep = 0.25      # with useFrameCache, angleDelta is rounded to multiples of angleStep degrees
+lengthScalingStep = 1 / 512           # with useFrameCache, lengthScaling is rounded to multiples of lengthScalingStep
 nx = 1                # normalized mouse coordinate in x-direction
 ny = 1                # normalized mouse coordinate in y-direction
 
@@ -149,6 +340,8 @@ pg.mouse.set_visible(True)
 # the tree object
 tree = Tree(7, 2)
 
+frameCache = FrameCache(frameCacheBytes)
+
 
 while 1:
 
@@ -166,11 +359,32 @@ while 1:
             ny = pos[1] / winHeight
         
 
-    # draw background
-    screen.fill(colorBg)
-
-    # draw tree with branch angles depending on mouse's x-coordinate and branch length scaling depending on mouse's y-coordinate
-    tree.draw( (winWidth*0.5, winHeight*0.7), -90, maxAngleDelta*nx, 100, maxLengthScaling*ny, colorInner, colorLeaf, 0 )
+    # tree drawing parameters. branch angles depend on mouse's x-coordinate and branch length scaling on mouse's y-coordinate
+    treePos = (winWidth*0.5, winHeight*0.7)
+    angleDelta = maxAngleDelta*nx
+    lengthScaling = maxLengthScaling*ny
+    length = 100
+    if useFrameCache:
+        angleDelta = quantize(angleDelta, angleStep)
+        lengthScaling = quantize(lengthScaling, lengthScalingStep)
+
+    frame = frameCache.get((angleDelta, lengthScaling, length, treePos)) if useFrameCache else None
+
+    if frame is not None:
+        screen.blit(frame, (0, 0))
+    else:
+        # draw background
+        screen.fill(colorBg)
+
+        # draw tree
+        if cullBranches:
+            tree.drawCulled( treePos, -90, angleDelta, length, lengthScaling, colorInner, colorLeaf, 0, minBranchLength )
+        elif useInstancing:
+            tree.drawInstanced( treePos, -90, angleDelta, length, lengthScaling, colorInner, colorLeaf, 0 )
+        else:
+            tree.draw( treePos, -90, angleDelta, length, lengthScaling, colorInner, colorLeaf, 0 )
+
+        if useFrameCache:
+            frameCache.put((angleDelta, lengthScaling, length, treePos), screen)
     
     pg.display.flip()
-
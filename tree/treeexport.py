@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Streaming export of tree branches to SVG, PDF and NumPy files
+
+iterBranchChunks yields the branches of a tree (see Tree.draw for the parameters) in depth-first
+order as structured NumPy arrays of chunkSize branches with the fields x0, y0, x1, y1, depth and
+leaf, using the self-similar instancing of treeshapes.py. The sinks write chunk by chunk to a
+file, so the memory used stays the same for any tree depth.
+
+Run this file to export a tree, the format is chosen by the file extension (.svg, .pdf, .npy):
+    python treeexport.py outputFile treeDepth numChildren angleDelta lengthScaling [length]
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+ 
+"""
+
+import sys
+import numpy as np
+from treeshapes import SubtreeShapes, iterInstancedBranches
+
+
+# fields of an exported branch. depth is the depth of the node the branch starts from
+branchDtype = np.dtype([("x0", np.float64), ("y0", np.float64), ("x1", np.float64), ("y1", np.float64),
+                        ("depth", np.uint16), ("leaf", np.bool_)])
+
+
+# returns the number of branches of a tree
+def getNumBranches( treeDepth, numChildren ):
+    return SubtreeShapes(numChildren, 0, 1).getShapeSize(treeDepth)
+
+
+# returns the radius of a circle around the root that contains the whole tree
+def getTreeReach( treeDepth, length, lengthScaling ):
+    reach = 0.0
+    for level in range(1, treeDepth):
+        reach += abs(length)
+        length *= lengthScaling
+    return reach
+
+
+# yields the branches of a tree in depth-first order as arrays of branchDtype with chunkSize
+# entries (the last one may be shorter)
+def iterBranchChunks( treeDepth, numChildren, pos, angle, angleDelta, length, lengthScaling, chunkSize=1 << 16 ):
+    chunk = np.empty(chunkSize, dtype=branchDtype)
+    n = 0
+
+    for x0, y0, x1, y1, depth, leaf in iterInstancedBranches(treeDepth, numChildren, pos, angle, angleDelta,
+                                                             length, lengthScaling):
+        start = 0
+        while start < len(x0):
+            count = min(len(x0) - start, chunkSize - n)
+            part = chunk[n:n+count]
+            part["x0"] = x0[start:start+count]
+            part["y0"] = y0[start:start+count]
+            part["x1"] = x1[start:start+count]
+            part["y1"] = y1[start:start+count]
+            part["depth"] = depth[start:start+count]
+            part["leaf"] = leaf[start:start+count]
+            n += count
+            start += count
+
+            if n == chunkSize:
+                yield chunk
+                chunk = np.empty(chunkSize, dtype=branchDtype)
+                n = 0
+
+    if n > 0:
+        yield chunk[0:n]
+
+
+# writes the chunks of branches into a .npy file of numBranches entries, through a memory map
+def writeNpy( path, chunks, numBranches ):
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=branchDtype, shape=(numBranches,))
+    n = 0
+    for chunk in chunks:
+        out[n:n+len(chunk)] = chunk
+        n += len(chunk)
+    out.flush()
+    del out
+
+
+# writes the chunks of branches as SVG paths, one path of inner and one of leaf branches per chunk
+def writeSvg( path, chunks, width, height, innerColor=(0, 0, 0), leafColor=(198, 0, 0), background=(255, 255, 255), lineWidth=1.0 ):
+    with open(path, "w") as f:
+        f.write('<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">\n'
+                % (width, height, width, height))
+        f.write('<rect width="100%%" height="100%%" fill="rgb(%d,%d,%d)"/>\n' % tuple(background))
+        f.write('<g fill="none" stroke-width="%g" stroke-linecap="round">\n' % lineWidth)
+
+        for chunk in chunks:
+            for leaf, color in ((False, innerColor), (True, leafColor)):
+                branches = chunk[chunk["leaf"] == leaf]
+                if len(branches) == 0:
+                    continue
+                f.write('<path stroke="rgb(%d,%d,%d)" d="' % tuple(color))
+                np.savetxt(f, __coordinates(branches), fmt="M%.2f %.2fL%.2f %.2f", newline=" ")
+                f.write('"/>\n')
+
+        f.write("</g>\n</svg>\n")
+
+
+# writes the chunks of branches as a one page PDF with the branches as stroked paths
+def writePdf( path, chunks, width, height, innerColor=(0, 0, 0), leafColor=(198, 0, 0), background=(255, 255, 255), lineWidth=1.0 ):
+    offsets = []
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        for obj in (b"<< /Type /Catalog /Pages 2 0 R >>",
+                    b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+                    b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents 4 0 R >>" % (width, height)):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (len(offsets), obj))
+
+        # content stream, its length is written as object 5 afterwards
+        offsets.append(f.tell())
+        f.write(b"4 0 obj\n<< /Length 5 0 R >>\nstream\n")
+        streamStart = f.tell()
+        f.write(b"%s rg 0 0 %d %d re f\n" % (__pdfColor(background), width, height))
+        f.write(b"1 0 0 -1 0 %d cm %g w 1 J\n" % (height, lineWidth))
+
+        for chunk in chunks:
+            for leaf, color in ((False, innerColor), (True, leafColor)):
+                branches = chunk[chunk["leaf"] == leaf]
+                if len(branches) == 0:
+                    continue
+                f.write(b"%s RG\n" % __pdfColor(color))
+                np.savetxt(f, __coordinates(branches), fmt="%.2f %.2f m %.2f %.2f l")
+                f.write(b"S\n")
+
+        streamLength = f.tell() - streamStart
+        f.write(b"endstream\nendobj\n")
+        offsets.append(f.tell())
+        f.write(b"5 0 obj\n%d\nendobj\n" % streamLength)
+
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref))
+
+
+def __coordinates( branches ):
+    return np.stack((branches["x0"], branches["y0"], branches["x1"], branches["y1"]), axis=1)
+
+
+def __pdfColor( color ):
+    return b"%.3f %.3f %.3f" % tuple(c / 255 for c in color)
+
+
+# exports a tree to the file at path, the format is chosen by the file extension
+# (.svg, .pdf or .npy). the tree grows upwards from the center of a square canvas that holds it
+def exportTree( path, treeDepth, numChildren, angleDelta, lengthScaling, length=100, chunkSize=1 << 16 ):
+    reach = getTreeReach(treeDepth, length, lengthScaling)
+    size = int(np.ceil(2*reach)) + 2
+    chunks = iterBranchChunks(treeDepth, numChildren, (size*0.5, size*0.5), -90, angleDelta, length, lengthScaling, chunkSize)
+
+    if path.lower().endswith(".npy"):
+        writeNpy(path, chunks, getNumBranches(treeDepth, numChildren))
+    elif path.lower().endswith(".pdf"):
+        writePdf(path, chunks, size, size)
+    else:
+        writeSvg(path, chunks, size, size)
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) not in (6, 7):
+        print("Usage: ", sys.argv[0], " outputFile treeDepth numChildren angleDelta lengthScaling [length]")
+        print("  exports a tree as .svg, .pdf or .npy file")
+        sys.exit()
+
+    exportTree(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]), float(sys.argv[5]),
+               float(sys.argv[6]) if len(sys.argv) == 7 else 100)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+/*
+ * Software License Agreement (BSD License)
+ *
+ * Copyright (c) 2019 Oliver Mayer, Akademie der Bildenden Kuenste Nuernberg. 
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ * 
+ * - Redistributions of source code must retain the above copyright notice,
+ *   this list of conditions and the following disclaimer.
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ *   this list of conditions and the following disclaimer in the documentation
+ *   and/or other materials provided with the distribution.
+ * 
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+ */
+ 
+
+Self-similar instancing of tree shapes
+
+Every subtree of a tree whose root node has depth d has the same shape up to a rotation, a scale
+and a translation. SubtreeShapes computes this shape once per depth in a local frame (root at the
+origin, direction 0 degrees, first branches of length 1) from the shape of depth d-1, and
+iterInstancedBranches places instances of the largest cached shape at the nodes of the tree with
+affine transforms. Geometry work grows with the tree depth, not with the number of nodes, and
+the branches are produced in batches, so trees with far more branches than fit into memory can
+be drawn.
+
+required modules:
+    numpy    https://pypi.org/project/numpy/
+ 
+"""
+
+import numpy as np
+
+
+# SubtreeShapes class. Computes and caches the branch segments of a subtree for each depth
+class SubtreeShapes:
+
+    # constructor. 
+    # numChildren:   number of children of a node
+    # angleDelta:    angle between two child branches (in degrees)
+    # lengthScaling: branch length is scaled by lengthScaling for every tree level
+    def __init__(self, numChildren, angleDelta, lengthScaling):
+        self.numChildren = numChildren
+        self.angleDelta = angleDelta
+        self.lengthScaling = lengthScaling
+
+        # directions of the children relative to the direction of their parent
+        self.childAngles = -(angleDelta*(numChildren-1)*0.5) + np.arange(numChildren)*angleDelta
+
+        self.__shapes = {}
+
+    # returns the number of branches of a subtree whose root has the given depth
+    def getShapeSize(self, depth):
+        k = self.numChildren
+        if k == 1:
+            return depth - 1
+        return (k**depth - 1) // (k - 1) - 1
+
+    # returns the largest depth <= treeDepth whose shape has at most maxShapeSize branches (at least 1)
+    def getInstanceDepth(self, treeDepth, maxShapeSize):
+        depth = 1
+        while depth < treeDepth and self.getShapeSize(depth + 1) <= maxShapeSize:
+            depth += 1
+        return depth
+
+    # returns the branches of a subtree whose root has the given depth as arrays
+    # (x0, y0, x1, y1, depth) in the local frame, in depth-first order. depth is the depth of the
+    # node a branch starts from
+    def getShape(self, depth):
+        shape = self.__shapes.get(depth)
+        if shape is not None:
+            return shape
+
+        if depth <= 1:
+            empty = np.zeros(0)
+            shape = (empty, empty, empty, empty, np.zeros(0, dtype=np.int64))
+        else:
+            # each child's branch followed by the smaller shape rotated, scaled and moved to the child
+            x0, y0, x1, y1, depths = self.getShape(depth - 1)
+            parts = []
+            for alpha in self.childAngles:
+                radians = np.radians(alpha)
+                cx = np.cos(radians)
+                cy = np.sin(radians)
+                parts.append(([0.0], [0.0], [cx], [cy], [depth]))
+                parts.append(transformBranches(x0, y0, x1, y1, cx, cy, alpha, self.lengthScaling) + (depths,))
+            shape = tuple(np.concatenate(arrays) for arrays in zip(*parts))
+            shape = shape[0:4] + (shape[4].astype(np.int64),)
+
+        self.__shapes[depth] = shape
+        return shape
+
+
+# rotates branches by angle (in degrees), scales them by scale and moves them by (x, y).
+# returns (x0, y0, x1, y1)
+def transformBranches( x0, y0, x1, y1, x, y, angle, scale ):
+    radians = np.radians(angle)
+    c = scale * np.cos(radians)
+    s = scale * np.sin(radians)
+    return x + c*x0 - s*y0, y + s*x0 + c*y0, x + c*x1 - s*y1, y + s*x1 + c*y1
+
+
+# yields the branches of a tree in depth-first order as batches of arrays (x0, y0, x1, y1, depth, leaf).
+# depth is the depth of the node a branch starts from, leaf is True for leaf branches.
+# see Tree.draw for the other parameters. maxShapeSize limits the size of the instanced shape
+def iterInstancedBranches( treeDepth, numChildren, pos, angle, angleDelta, length, lengthScaling, maxShapeSize=4096 ):
+    shapes = SubtreeShapes(numChildren, angleDelta, lengthScaling)
+    instanceDepth = shapes.getInstanceDepth(treeDepth, maxShapeSize)
+    return __iterSubtree(shapes, instanceDepth, treeDepth, pos[0], pos[1], angle, length)
+
+
+# yields the branches of the subtree of a node with the given depth at (x, y), with direction
+# angle and first branch length, placing instances of the shape of depth instanceDepth
+def __iterSubtree( shapes, instanceDepth, depth, x, y, angle, length ):
+    if depth <= instanceDepth:
+        x0, y0, x1, y1, depths = shapes.getShape(depth)
+        if len(x0) > 0:
+            yield transformBranches(x0, y0, x1, y1, x, y, angle, length) + (depths, depths <= 2)
+        return
+
+    for childAngle in shapes.childAngles:
+        alpha = angle + childAngle
+        radians = np.radians(alpha)
+        childX = x + length * np.cos(radians)
+        childY = y + length * np.sin(radians)
+
+        yield (np.array([x]), np.array([y]), np.array([childX]), np.array([childY]),
+               np.array([depth]), np.array([depth <= 2]))
+        yield from __iterSubtree(shapes, instanceDepth, depth - 1, childX, childY, alpha, length*shapes.lengthScaling)